@@ -1,55 +1,108 @@
-import ephem
 import logging
+import math
 import numpy as np
+from functools import lru_cache
 from datetime import datetime, date, time, timedelta, timezone
-from typing import Dict, Optional, Literal
+from typing import Dict, Optional, Literal, Tuple
 import xarray as xr
-from tqdm.auto import tqdm
 
 logger = logging.getLogger(__name__)
 
+
+@lru_cache(maxsize=32)
+def _solar_declination_and_eot(target_date: date) -> Tuple[float, float]:
+    """
+    计算指定日期的太阳赤纬（弧度）和均时差（分钟）。
+
+    使用 NOAA/ESRL 的傅里叶级数近似，两者仅依赖日期（对全网格是标量），
+    因此按日期缓存，同一天内的多次掩码计算（多个事件时间点）可直接复用。
+    """
+    day_of_year = target_date.timetuple().tm_yday
+    # 年分数角 γ（以正午为参考点）
+    gamma = 2.0 * math.pi / 365.0 * (day_of_year - 1 + 0.5)
+
+    eqtime_minutes = 229.18 * (
+        0.000075
+        + 0.001868 * math.cos(gamma) - 0.032077 * math.sin(gamma)
+        - 0.014615 * math.cos(2 * gamma) - 0.040849 * math.sin(2 * gamma)
+    )
+    declination_rad = (
+        0.006918
+        - 0.399912 * math.cos(gamma) + 0.070257 * math.sin(gamma)
+        - 0.006758 * math.cos(2 * gamma) + 0.000907 * math.sin(2 * gamma)
+        - 0.002697 * math.cos(3 * gamma) + 0.00148 * math.sin(3 * gamma)
+    )
+    return declination_rad, eqtime_minutes
+
+
 class AstronomyService:
     """提供基于地理坐标和日期的天文事件计算服务。"""
 
     def get_sun_position(self, lat: float, lon: float, utc_time: datetime) -> Dict[str, float]:
-        """计算指定地点和时间的太阳位置（高度角和方位角）。"""
-        observer = ephem.Observer()
-        observer.lat = str(lat)
-        observer.lon = str(lon)
-        observer.date = utc_time
-        observer.pressure = 0
-        observer.horizon = '-0:34'
-        sun = ephem.Sun()
-        sun.compute(observer)
-        return {"altitude": np.degrees(sun.alt), "azimuth": np.degrees(sun.az)}
+        """计算指定地点和时间的太阳位置（高度角和方位角，单位：度）。"""
+        grid_pos = self.get_sun_position_grid(np.float64(lat), np.float64(lon), utc_time)
+        return {"altitude": float(grid_pos["altitude"]), "azimuth": float(grid_pos["azimuth"])}
+
+    def get_sun_position_grid(self, lats: np.ndarray, lons: np.ndarray, utc_time: datetime) -> Dict[str, np.ndarray]:
+        """
+        矢量化版本：对一批坐标点同时计算太阳位置（高度角和方位角，单位：度）。
+
+        使用与事件掩码相同的 NOAA 公式做 NumPy 广播计算，
+        lats/lons 可以是任意（可广播的）数组形状，无逐点的标量迭代。
+        """
+        utc = utc_time.astimezone(timezone.utc)
+        declination, eqtime_minutes = _solar_declination_and_eot(utc.date())
+
+        lats = np.asarray(lats, dtype=np.float64)
+        lons = np.asarray(lons, dtype=np.float64)
+        lat_rad = np.radians(lats)
+
+        # 真太阳时（分钟）→ 时角（太阳偏离当地正午的角度）
+        minutes_utc = utc.hour * 60.0 + utc.minute + utc.second / 60.0
+        true_solar_minutes = minutes_utc + eqtime_minutes + 4.0 * lons
+        hour_angle_rad = np.radians(true_solar_minutes / 4.0 - 180.0)
+
+        sin_altitude = (
+            np.sin(lat_rad) * np.sin(declination)
+            + np.cos(lat_rad) * np.cos(declination) * np.cos(hour_angle_rad)
+        )
+        altitude = np.degrees(np.arcsin(np.clip(sin_altitude, -1.0, 1.0)))
+
+        # 方位角以正北为 0°，顺时针增加
+        azimuth_rad = np.arctan2(
+            np.sin(hour_angle_rad),
+            np.cos(hour_angle_rad) * np.sin(lat_rad) - np.tan(declination) * np.cos(lat_rad),
+        )
+        azimuth = (np.degrees(azimuth_rad) + 180.0) % 360.0
+
+        return {"altitude": altitude, "azimuth": azimuth}
 
     def _calculate_single_event_time(self, lat: float, lon: float, target_date: date, event: Literal["sunrise", "sunset"]) -> Optional[datetime]:
-        """为单个点计算日出或日落的UTC时间。"""
-        observer = ephem.Observer()
-        observer.lat = str(lat)
-        observer.lon = str(lon)
-        observer.elevation = 0
-        observer.horizon = '-0.833'
-        sun = ephem.Sun()
-        
-        observer.date = datetime.combine(target_date, time(0, 0), tzinfo=timezone.utc)
-        
-        try:
-            if event == "sunrise":
-                event_time_pyephem = observer.next_rising(sun, use_center=True)
-            else: # sunset
-                event_time_pyephem = observer.next_setting(sun, use_center=True)
-            
-            utc_dt = event_time_pyephem.datetime().replace(tzinfo=timezone.utc)
-
-            if utc_dt.date() != target_date:
-                return None
-            return utc_dt
-        except (ephem.AlwaysUpError, ephem.NeverUpError):
-            return None
-        except Exception as e:
-            logger.debug(f"在 ({lat}, {lon}) 计算天文事件时出错: {e}")
+        """
+        为单个点计算日出或日落的UTC时间。
+
+        与事件掩码使用同一套 NOAA 闭式公式：极昼/极夜（|cos H| > 1）返回 None，
+        事件分钟数按 24 小时折叠，保证结果落在目标日期当天。
+        """
+        declination, eqtime_minutes = _solar_declination_and_eot(target_date)
+        lat_rad = math.radians(lat)
+
+        # 日出/日落时太阳天顶角为 90.833°（含大气折射与太阳视半径）
+        cos_hour_angle = (
+            math.cos(math.radians(90.833)) / (math.cos(lat_rad) * math.cos(declination))
+            - math.tan(lat_rad) * math.tan(declination)
+        )
+        if abs(cos_hour_angle) > 1.0:
             return None
+        hour_angle_deg = math.degrees(math.acos(cos_hour_angle))
+
+        if event == "sunrise":
+            event_minutes = 720.0 - 4.0 * (lon + hour_angle_deg) - eqtime_minutes
+        else:  # sunset
+            event_minutes = 720.0 - 4.0 * (lon - hour_angle_deg) - eqtime_minutes
+
+        day_start = datetime.combine(target_date, time(0, 0), tzinfo=timezone.utc)
+        return day_start + timedelta(minutes=event_minutes % 1440.0)
 
     def create_event_mask(
         self,
@@ -59,20 +112,47 @@ class AstronomyService:
         event: Literal["sunrise", "sunset"],
         window_minutes: int = 60
     ) -> xr.DataArray:
-        """为整个网格创建一个布尔掩码，标记出在目标时间窗口内发生指定天文事件的区域。"""
+        """
+        为整个网格创建一个布尔掩码，标记出在目标时间窗口内发生指定天文事件的区域。
+
+        采用闭式的 NOAA 太阳位置公式在整个 (lat, lon) 网格上做 NumPy 广播计算，
+        替代逐格点调用 PyEphem 迭代求根（约 67k 次标量调用），速度提升数个量级。
+        """
         logger.info(f"正在为 {event} 创建时间掩码，中心时间: {target_utc_time.strftime('%H:%M')} UTC, 窗口: ±{window_minutes}分钟")
-        
-        mask_grid = np.full((len(lats), len(lons)), False, dtype=bool)
+
         target_date = target_utc_time.date()
-        time_window = timedelta(minutes=window_minutes)
-
-        with tqdm(total=len(lats) * len(lons), desc=f"Calculating {event} times") as pbar:
-            for i, lat in enumerate(lats.values):
-                for j, lon in enumerate(lons.values):
-                    event_time_utc = self._calculate_single_event_time(lat, lon, target_date, event)
-                    if event_time_utc and abs(event_time_utc - target_utc_time) <= time_window:
-                        mask_grid[i, j] = True
-                    pbar.update(1)
+        declination, eqtime_minutes = _solar_declination_and_eot(target_date)
+
+        # 通过广播（列向量 × 行向量）代替显式 meshgrid，省去两个全尺寸网格的分配
+        lat_col = lats.values[:, np.newaxis]
+        lon_row = lons.values[np.newaxis, :]
+        lat_rad = np.radians(lat_col)
+
+        # 日出/日落时太阳天顶角为 90.833°（含大气折射与太阳视半径，即地平线 -0.833°）
+        cos_hour_angle = (
+            np.cos(np.radians(90.833)) / (np.cos(lat_rad) * np.cos(declination))
+            - np.tan(lat_rad) * np.tan(declination)
+        )
+        # |cos H| > 1 表示极昼/极夜，当天没有日出日落事件
+        polar_mask = np.abs(cos_hour_angle) > 1.0
+        hour_angle_deg = np.degrees(np.arccos(np.clip(cos_hour_angle, -1.0, 1.0)))
+
+        # UTC 事件时刻（自当天 00:00 UTC 起的分钟数）：正午 = 720 − 4·lon − E
+        if event == "sunrise":
+            event_minutes = 720.0 - 4.0 * (lon_row + hour_angle_deg) - eqtime_minutes
+        else:  # sunset
+            event_minutes = 720.0 - 4.0 * (lon_row - hour_angle_deg) - eqtime_minutes
+
+        # 转为 datetime64[s] 数组并与目标时间做单次矢量化比较。
+        # 事件每 ~24h 重复一次，将差值折叠到 ±12h 内，避免跨 UTC 日期边界的偏差。
+        day_start = np.datetime64(target_date.isoformat(), 's')
+        event_times = day_start + np.round(event_minutes * 60.0).astype('timedelta64[s]')
+        target_np = np.datetime64(target_utc_time.astimezone(timezone.utc).replace(tzinfo=None), 's')
+        delta_seconds = (event_times - target_np).astype(np.int64)
+        delta_wrapped = (delta_seconds + 43200) % 86400 - 43200
+
+        mask_grid = np.abs(delta_wrapped) <= window_minutes * 60
+        mask_grid &= ~polar_mask
 
         return xr.DataArray(
             mask_grid,
@@ -1,11 +1,13 @@
 # src/chromasky_toolkit/data_acquisition.py
 
 import logging
+import numpy as np
 import requests
-import json
-import cdsapi
+import shutil
 import zipfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta, timezone
+from functools import lru_cache
 from pathlib import Path
 from zoneinfo import ZoneInfo
 from typing import Tuple, Dict, List, Optional # <--- MODIFIED
@@ -16,17 +18,49 @@ from . import config
 
 logger = logging.getLogger(__name__)
 
+# 模块级 HTTP 会话：GFS 多个时效的下载复用同一连接池（keep-alive），
+# 免去每个请求重新建立 TCP/TLS 连接的开销。CAMS 侧由 cdsapi 客户端自行管理连接。
+_http_session = requests.Session()
+
 # --- NEW: 定义一个模块级的变量来存储 GFS 网格模板 ---
 _gfs_grid_template: Optional[xr.Dataset] = None
 
+# 模板落盘路径：避免每个新进程都必须先跑一遍 GFS GRIB 处理才能重建网格
+GFS_GRID_TEMPLATE_PATH: Path = config.PROCESSED_DATA_DIR / "gfs_grid_template.nc"
+
+
+def _get_gfs_grid_template() -> Optional[xr.Dataset]:
+    """获取 GFS 网格模板：优先用内存缓存，否则尝试从磁盘加载持久化副本。"""
+    global _gfs_grid_template
+    if _gfs_grid_template is None and GFS_GRID_TEMPLATE_PATH.exists():
+        try:
+            _gfs_grid_template = xr.open_dataset(GFS_GRID_TEMPLATE_PATH)
+            logger.info(f"✅ [Template] 已从磁盘加载 GFS 网格模板: {GFS_GRID_TEMPLATE_PATH.name}")
+        except Exception as e:
+            logger.warning(f"⚠️ [Template] 加载磁盘模板失败，将等待 GFS 处理重建: {e}")
+    return _gfs_grid_template
+
 # ======================================================================
 # --- GFS 数据获取与处理 ---
 # ======================================================================
 
+def _current_utc_hour() -> datetime:
+    """当前 UTC 时间截断到整点，作为运行周期查找结果的缓存键。
+
+    GFS/CAMS 运行周期的可用性只会在整点（run_hour + safe_margin）发生变化，
+    因此以小时为粒度缓存是精确的，不会返回过期结果。
+    """
+    return datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
+
+
 def _find_latest_available_gfs_run() -> Tuple[str, str] | None:
-    """智能判断当前可用的最新 GFS 运行周期。"""
+    """智能判断当前可用的最新 GFS 运行周期（按小时缓存）。"""
+    return _find_gfs_run_for_hour(_current_utc_hour())
+
+
+@lru_cache(maxsize=8)
+def _find_gfs_run_for_hour(now_utc: datetime) -> Tuple[str, str] | None:
     logger.info("--- [GFS] 正在寻找最新的可用运行周期...")
-    now_utc = datetime.now(timezone.utc)
     safe_margin = timedelta(hours=5)
 
     for i in range(10):
@@ -53,17 +87,28 @@ def _process_gfs_grib_to_nc(grib_path: Path, target_time_utc: datetime):
         ds = xr.open_dataset(
             grib_path,
             engine="cfgrib",
-            filter_by_keys={'stepType': 'instant'},
-            decode_timedelta=True  # <-- 添加此参数以消除警告并确保未来兼容性
+            decode_timedelta=True,  # <-- 添加此参数以消除警告并确保未来兼容性
+            backend_kwargs={
+                'filter_by_keys': {'stepType': 'instant'},
+                # 将消息索引固定写在 GRIB 文件旁并复用，
+                # 同一 GRIB 被多个事件重复处理时无需重新扫描构建索引
+                'indexpath': str(grib_path) + '.idx',
+            },
         )
         
         # <--- NEW: 如果模板尚未创建，则创建它 ---
         if _gfs_grid_template is None:
-            _gfs_grid_template = ds.copy() # 复制一份以备后用
-            # 为了减小内存占用，可以只保留坐标
-            # _gfs_grid_template = ds[[]].copy() # 这样只复制坐标和维度
+            # 重采样只需要坐标和维度，不复制任何数据变量，避免整份 GFS 数据驻留内存
+            _gfs_grid_template = ds.drop_vars(list(ds.data_vars))
             logger.info("✅ [Template] 已成功从 GFS 数据创建网格模板。")
             logger.debug(f"  - 模板网格尺寸: {_gfs_grid_template.dims}")
+            # 持久化坐标信息（interp_like 只需要坐标），后续进程无需重跑 GFS 即可重建模板
+            try:
+                GFS_GRID_TEMPLATE_PATH.parent.mkdir(parents=True, exist_ok=True)
+                _gfs_grid_template.to_netcdf(GFS_GRID_TEMPLATE_PATH)
+                logger.info(f"✅ [Template] 网格模板已持久化到: {GFS_GRID_TEMPLATE_PATH.name}")
+            except Exception as e:
+                logger.warning(f"⚠️ [Template] 持久化网格模板失败（不影响本次流程）: {e}")
         
         local_dt = target_time_utc.astimezone(local_tz)
         local_date_str = local_dt.strftime('%Y-%m-%d')
@@ -72,81 +117,187 @@ def _process_gfs_grib_to_nc(grib_path: Path, target_time_utc: datetime):
         output_dir = config.PROCESSED_DATA_DIR / "future" / local_date_str
         output_dir.mkdir(parents=True, exist_ok=True)
 
+        present_vars = [v for v in config.GFS_VARS_LIST if v in ds]
         for short_name in config.GFS_VARS_LIST:
-            if short_name in ds:
-                data_slice = ds[short_name]
-                if data_slice.max() > 1.0:
-                    logger.debug(f"  - 归一化变量 '{short_name}' (原最大值: {data_slice.max().item():.2f})")
-                    data_slice = data_slice / 100.0
-                
-                data_slice.attrs['units'] = '(0-1)'
-                data_slice.attrs['standard_name'] = short_name
-                data_slice.attrs['original_utc_time'] = target_time_utc.isoformat()
-                
-                output_path = output_dir / f"{short_name}_{local_time_str_path}.nc"
-                data_slice.to_netcdf(output_path)
-                logger.info(f"  ✅ [GFS] 已处理并保存: {output_path.relative_to(config.LOG_BASE_PATH)}")
-            else:
+            if short_name not in ds:
                 logger.warning(f"  - 在GRIB文件中未找到变量: {short_name}")
+
+        # 所有 GFS 云量变量同为百分比单位，堆叠后求一次全局最大值即可判断，
+        # 归一化在单个矢量化表达式中完成，省去逐变量的两次 .max() 归约
+        subset = ds[present_vars]
+        if present_vars and float(subset.to_array().max()) > 1.0:
+            logger.debug(f"  - 检测到百分比单位，统一归一化变量: {present_vars}")
+            subset = subset / 100.0
+
+        # 先收集所有变量切片，再通过 save_mfdataset 一次性批量写出，
+        # 避免每个变量单独走一遍 to_netcdf 的打开/关闭开销
+        datasets_to_write = []
+        output_paths = []
+        for short_name in present_vars:
+            data_slice = subset[short_name]
+            data_slice.attrs['units'] = '(0-1)'
+            data_slice.attrs['standard_name'] = short_name
+            data_slice.attrs['original_utc_time'] = target_time_utc.isoformat()
+
+            datasets_to_write.append(data_slice.to_dataset(name=short_name))
+            output_paths.append(output_dir / f"{short_name}_{local_time_str_path}.nc")
+
+        if datasets_to_write:
+            xr.save_mfdataset(datasets_to_write, output_paths)
+            for output_path in output_paths:
+                logger.info(f"  ✅ [GFS] 已处理并保存: {output_path.relative_to(config.LOG_BASE_PATH)}")
     except Exception as e:
         logger.error(f"❌ [GFS] 处理 GRIB 文件 {grib_path.name} 时出错: {e}", exc_info=True)
 
 
+def _download_gfs_grib(grib_path: Path, forecast_hour: int, run_date: str, run_hour: str) -> bool:
+    """下载单个预报时效的 GRIB 文件。返回 True 表示文件可用。"""
+    if grib_path.exists() and grib_path.stat().st_size > 1024:
+        logger.info(f"  - GRIB 数据已存在: {grib_path.name}，跳过下载。")
+        return True
+
+    logger.info(f"  - 正在下载 GRIB (预报时效: f{forecast_hour:03d})")
+    params = {
+        "file": f"gfs.t{run_hour}z.pgrb2.0p25.f{forecast_hour:03d}",
+        "dir": f"/gfs.{run_date}/{run_hour}/atmos",
+        "subregion": "", "leftlon": config.DOWNLOAD_AREA['west'], "rightlon": config.DOWNLOAD_AREA['east'],
+        "toplat": config.DOWNLOAD_AREA['north'], "bottomlat": config.DOWNLOAD_AREA['south'],
+        'var_HCDC': 'on', 'lev_high_cloud_layer': 'on',
+        'var_MCDC': 'on', 'lev_middle_cloud_layer': 'on',
+        'var_LCDC': 'on', 'lev_low_cloud_layer': 'on',
+    }
+    try:
+        response = _http_session.get(config.GFS_BASE_URL, params=params, stream=True, timeout=300)
+        response.raise_for_status()
+        # 1 MiB 的流式分块：相比 8 KiB 大幅减少循环次数和系统调用
+        with open(grib_path, "wb") as f:
+            for chunk in response.iter_content(chunk_size=1024 * 1024):
+                f.write(chunk)
+        logger.info(f"  ✅ [GFS] GRIB 数据已保存到: {grib_path.name}")
+        return True
+    except requests.RequestException as e:
+        logger.error(f"  ❌ [GFS] GRIB 下载失败 (f{forecast_hour:03d}): {e}")
+        return False
+
+
 def acquire_gfs_data(target_events: Dict[str, datetime]):
-    """为指定的目标事件列表下载和处理GFS数据。"""
+    """为指定的目标事件列表下载和处理GFS数据。下载阶段并发执行，处理阶段串行。"""
     run_info = _find_latest_available_gfs_run()
     if not run_info:
         return
     run_date, run_hour = run_info
     run_time_utc = datetime.strptime(f"{run_date}{run_hour}", "%Y%m%d%H").replace(tzinfo=timezone.utc)
-    
+
+    raw_grib_dir = config.GFS_DATA_DIR / f"{run_date}_t{run_hour}z"
+    raw_grib_dir.mkdir(parents=True, exist_ok=True)
+
+    # 1. 先为所有事件规划出需要的 GRIB 文件（多个事件可能共用同一预报时效）
+    event_grib_paths: Dict[str, Path] = {}
+    downloads: Dict[Path, int] = {}
     for event_name, target_time_utc in target_events.items():
-        logger.info(f"--- [GFS] 开始处理事件: {event_name} ---")
-        
         time_diff_hours = (target_time_utc - run_time_utc).total_seconds() / 3600
         if time_diff_hours < 0:
             logger.warning(f"  - 事件 '{event_name}' 的时间早于最新运行周期，跳过。")
             continue
         forecast_hour = round(time_diff_hours)
-        
-        raw_grib_dir = config.GFS_DATA_DIR / f"{run_date}_t{run_hour}z"
-        raw_grib_dir.mkdir(parents=True, exist_ok=True)
         grib_path = raw_grib_dir / f"gfs_f{forecast_hour:03d}.grib2"
-        
-        if grib_path.exists() and grib_path.stat().st_size > 1024:
-            logger.info(f"  - GRIB 数据已存在: {grib_path.name}，跳过下载。")
-        else:
-            logger.info(f"  - 正在为事件 '{event_name}' 下载 GRIB (预报时效: f{forecast_hour:03d})")
-            params = {
-                "file": f"gfs.t{run_hour}z.pgrb2.0p25.f{forecast_hour:03d}",
-                "dir": f"/gfs.{run_date}/{run_hour}/atmos",
-                "subregion": "", "leftlon": config.DOWNLOAD_AREA['west'], "rightlon": config.DOWNLOAD_AREA['east'],
-                "toplat": config.DOWNLOAD_AREA['north'], "bottomlat": config.DOWNLOAD_AREA['south'],
-                'var_HCDC': 'on', 'lev_high_cloud_layer': 'on',
-                'var_MCDC': 'on', 'lev_middle_cloud_layer': 'on',
-                'var_LCDC': 'on', 'lev_low_cloud_layer': 'on',
-            }
-            try:
-                response = requests.get(config.GFS_BASE_URL, params=params, stream=True, timeout=300)
-                response.raise_for_status()
-                with open(grib_path, "wb") as f:
-                    for chunk in response.iter_content(chunk_size=8192): f.write(chunk)
-                logger.info(f"  ✅ [GFS] GRIB 数据已保存到: {grib_path.name}")
-            except requests.RequestException as e:
-                logger.error(f"  ❌ [GFS] GRIB 下载失败: {e}")
-                continue
-        
-        # 无论是否下载，都进行处理
+        event_grib_paths[event_name] = grib_path
+        downloads[grib_path] = forecast_hour
+
+    if not event_grib_paths:
+        return
+
+    # 2. 并发下载所有缺失的 GRIB（网络 I/O 密集，线程池即可；限流避免对 NOMADS 造成压力）
+    download_ok: Dict[Path, bool] = {}
+    max_workers = min(4, len(downloads))
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        future_map = {
+            executor.submit(_download_gfs_grib, grib_path, forecast_hour, run_date, run_hour): grib_path
+            for grib_path, forecast_hour in downloads.items()
+        }
+        for future in as_completed(future_map):
+            download_ok[future_map[future]] = future.result()
+
+    # 3. 串行处理（cfgrib 解码与模板创建保持单线程，行为与原实现一致）
+    for event_name, target_time_utc in target_events.items():
+        grib_path = event_grib_paths.get(event_name)
+        if grib_path is None or not download_ok.get(grib_path):
+            continue
+        logger.info(f"--- [GFS] 开始处理事件: {event_name} ---")
         _process_gfs_grib_to_nc(grib_path, target_time_utc)
 
 # ======================================================================
 # --- CAMS AOD 数据获取与处理 ---
 # ======================================================================
 
+class _BilinearRegridder:
+    """
+    预计算源网格到目标网格的双线性插值索引与权重。
+
+    CAMS 与 GFS 都是规则经纬度网格，且在一次运行中固定不变，
+    因此索引/权重只需构建一次，即可在所有事件和变量之间复用，
+    替代每个切片都重新做坐标查找的 interp_like。
+    目标点落在源网格之外时填 0，与原先 fill_value=0 + fillna(0) 的行为一致。
+    """
+
+    def __init__(self, src_lats: np.ndarray, src_lons: np.ndarray,
+                 dst_lats: np.ndarray, dst_lons: np.ndarray):
+        self.lat_idx0, self.lat_idx1, self.lat_w, lat_oob = self._axis_weights(src_lats, dst_lats)
+        self.lon_idx0, self.lon_idx1, self.lon_w, lon_oob = self._axis_weights(src_lons, dst_lons)
+        self.oob_mask = lat_oob[:, None] | lon_oob[None, :]
+
+    @staticmethod
+    def _axis_weights(src, dst):
+        """计算单个坐标轴上的左右邻居索引和线性权重，兼容升序/降序坐标。"""
+        src = np.asarray(src, dtype=np.float64)
+        dst = np.asarray(dst, dtype=np.float64)
+        ascending = src[0] <= src[-1]
+        s = src if ascending else src[::-1]
+        j = np.clip(np.searchsorted(s, dst, side='right') - 1, 0, len(s) - 2)
+        w = np.clip((dst - s[j]) / (s[j + 1] - s[j]), 0.0, 1.0)
+        oob = (dst < s[0]) | (dst > s[-1])
+        if not ascending:
+            n = len(src)
+            return n - 1 - (j + 1), n - 1 - j, 1.0 - w, oob
+        return j, j + 1, w, oob
+
+    def __call__(self, values: np.ndarray) -> np.ndarray:
+        """将 (src_lat, src_lon) 的二维数组重采样到目标网格。"""
+        v = np.nan_to_num(np.asarray(values, dtype=np.float64), nan=0.0)
+        wy = self.lat_w[:, None]
+        wx = self.lon_w[None, :]
+        out = (
+            v[np.ix_(self.lat_idx0, self.lon_idx0)] * (1 - wy) * (1 - wx)
+            + v[np.ix_(self.lat_idx0, self.lon_idx1)] * (1 - wy) * wx
+            + v[np.ix_(self.lat_idx1, self.lon_idx0)] * wy * (1 - wx)
+            + v[np.ix_(self.lat_idx1, self.lon_idx1)] * wy * wx
+        )
+        out[self.oob_mask] = 0.0
+        return out
+
+
+# 以 (源网格, 目标网格) 的坐标指纹为键缓存重采样器
+_regridder_cache: Dict[tuple, _BilinearRegridder] = {}
+
+
+def _get_regridder(src_lats, src_lons, dst_lats, dst_lons) -> _BilinearRegridder:
+    """获取（必要时构建）给定网格对的双线性重采样器。"""
+    key = (src_lats.tobytes(), src_lons.tobytes(), dst_lats.tobytes(), dst_lons.tobytes())
+    regridder = _regridder_cache.get(key)
+    if regridder is None:
+        regridder = _BilinearRegridder(src_lats, src_lons, dst_lats, dst_lons)
+        _regridder_cache[key] = regridder
+    return regridder
+
+
 def _find_latest_available_cams_run() -> Tuple[str, str] | None:
-    """智能判断当前可用的最新 CAMS 运行周期 (00z 或 12z)。"""
+    """智能判断当前可用的最新 CAMS 运行周期 (00z 或 12z)（按小时缓存）。"""
+    return _find_cams_run_for_hour(_current_utc_hour())
+
+
+@lru_cache(maxsize=8)
+def _find_cams_run_for_hour(now_utc: datetime) -> Tuple[str, str] | None:
     logger.info("--- [CAMS] 正在寻找最新的可用运行周期...")
-    now_utc = datetime.now(timezone.utc)
     safe_margin = timedelta(hours=9)
     
     for i in range(4):
@@ -168,10 +319,9 @@ def _process_cams_nc_to_nc(raw_nc_path: Path, target_events: Dict[str, datetime]
     """
     将下载的包含多个时效的CAMS文件，分解、重采样到GFS网格，并保存为标准的单时效NetCDF文件。
     """
-    global _gfs_grid_template # 引用全局模板
-
-    # 检查模板是否存在，这是处理 CAMS 的前提
-    if _gfs_grid_template is None:
+    # 检查模板是否存在（内存缓存或磁盘持久化副本），这是处理 CAMS 的前提
+    gfs_grid_template = _get_gfs_grid_template()
+    if gfs_grid_template is None:
         logger.error("❌ [CAMS] 未找到 GFS 网格模板，无法对 CAMS 数据进行重采样。请先成功运行 GFS 数据处理流程。")
         return
 
@@ -181,14 +331,21 @@ def _process_cams_nc_to_nc(raw_nc_path: Path, target_events: Dict[str, datetime]
             logger.info(f"--- [CAMS] 开始处理原始 CAMS 文件: {raw_nc_path.name} ---")
             logger.debug(f"  - 原始CAMS网格尺寸: {ds_cams_raw.dims}")
 
+            # 先裁剪到需要的变量，后续每个事件的时间片选择只处理这些变量
+            wanted_vars = [v for v in config.CAMS_VARS_MAP if v in ds_cams_raw]
+            if not wanted_vars:
+                logger.warning(f"  - 原始 CAMS 文件中未找到任何目标变量: {list(config.CAMS_VARS_MAP)}")
+                return
+            ds_cams_wanted = ds_cams_raw[wanted_vars]
+
             for event_name, target_time_utc in target_events.items():
                 leadtime_hour = round((target_time_utc - base_run_time).total_seconds() / 3600)
                 if leadtime_hour < 0:
                     continue
-                
+
                 target_forecast_period = timedelta(hours=leadtime_hour)
                 # 1. 从原始CAMS数据中选择正确的时间片
-                time_slice = ds_cams_raw.sel(forecast_period=target_forecast_period, method='nearest').squeeze()
+                time_slice = ds_cams_wanted.sel(forecast_period=target_forecast_period, method='nearest').squeeze()
                 
                 local_dt = target_time_utc.astimezone(local_tz)
                 local_date_str = local_dt.strftime('%Y-%m-%d')
@@ -202,12 +359,22 @@ def _process_cams_nc_to_nc(raw_nc_path: Path, target_events: Dict[str, datetime]
                         original_slice = time_slice[short_name]
 
                         # 3. 【核心步骤】重采样到 GFS 网格
+                        # 索引与权重由 _BilinearRegridder 预计算并缓存，
+                        # 所有事件/变量共用同一套权重，省去 interp_like 每次重建的开销
                         logger.info(f"  - 正在为事件 '{event_name}' 重采样变量 '{short_name}'...")
-                        resampled_slice = original_slice.interp_like(
-                            _gfs_grid_template, 
-                            method='linear', 
-                            kwargs={"fill_value": 0.0}
-                        ).fillna(0.0)
+                        regridder = _get_regridder(
+                            original_slice['latitude'].values, original_slice['longitude'].values,
+                            gfs_grid_template['latitude'].values, gfs_grid_template['longitude'].values,
+                        )
+                        resampled_slice = xr.DataArray(
+                            regridder(original_slice.values),
+                            coords={
+                                'latitude': gfs_grid_template['latitude'].values,
+                                'longitude': gfs_grid_template['longitude'].values,
+                            },
+                            dims=['latitude', 'longitude'],
+                            name=short_name,
+                        )
 
                         # 4. 为重采样后的数据添加元数据
                         resampled_slice.attrs['standard_name'] = short_name
@@ -231,11 +398,10 @@ def acquire_cams_data(target_events: Dict[str, datetime]) -> bool:
     run_date_str, run_hour_str = run_info
     base_run_time = datetime.strptime(f"{run_date_str} {run_hour_str}", "%Y-%m-%d %H:%M").replace(tzinfo=timezone.utc)
     
-    leadtime_hours = {
-        round((t - base_run_time).total_seconds() / 3600)
-        for t in target_events.values()
-    }
-    valid_leadtime_hours = sorted([str(h) for h in leadtime_hours if h >= 0])
+    # 一次性对所有事件做矢量化的时差计算，去重并按数值（而非字符串字典序）排序
+    target_seconds = np.array([t.timestamp() for t in target_events.values()])
+    leadtime_hours = np.unique(np.rint((target_seconds - base_run_time.timestamp()) / 3600).astype(int))
+    valid_leadtime_hours = [str(h) for h in leadtime_hours if h >= 0]
     
     if not valid_leadtime_hours:
         logger.warning("[CAMS] 没有需要下载的未来预报时效。")
@@ -252,6 +418,8 @@ def acquire_cams_data(target_events: Dict[str, datetime]) -> bool:
         logger.info(f"--- [CAMS] 开始为运行周期 {run_date_str} {run_hour_str} 下载新数据 ---")
         logger.info(f"  - 将下载 {len(valid_leadtime_hours)} 个预报时效: {valid_leadtime_hours}")
         try:
+            # cdsapi 导入开销大且仅下载时需要，延迟到此处以加快模块冷启动
+            import cdsapi
             c = cdsapi.Client(url=config.CDS_API_URL, key=config.CDS_API_KEY, timeout=600, quiet=False)
 
             # 不传 area 参数：ecmwf-datastores-client 会在指定 area 时自动追加 grid 参数，
@@ -267,14 +435,18 @@ def acquire_cams_data(target_events: Dict[str, datetime]) -> bool:
                 str(temp_dl_path)
             )
             
-            if zipfile.is_zipfile(temp_dl_path):
-                logger.info("  - 检测到ZIP包，正在解压...")
+            # 通过文件头魔数判断是否为 ZIP（免去 is_zipfile 对中央目录的完整扫描），
+            # 并把 ZIP 内的 NetCDF 成员直接流式写到目标路径，不经过"解压到目录再改名"
+            with open(temp_dl_path, 'rb') as f:
+                is_zip = f.read(4) == b'PK\x03\x04'
+            if is_zip:
+                logger.info("  - 检测到ZIP包，正在流式解压...")
                 with zipfile.ZipFile(temp_dl_path, 'r') as zip_ref:
                     nc_file_in_zip = zip_ref.namelist()[0]
-                    zip_ref.extract(nc_file_in_zip, raw_nc_dir)
-                    (raw_nc_dir / nc_file_in_zip).rename(raw_nc_path)
+                    with zip_ref.open(nc_file_in_zip) as src, open(raw_nc_path, 'wb') as dst:
+                        shutil.copyfileobj(src, dst, length=1024 * 1024)
             else:
-                temp_dl_path.rename(raw_nc_path)
+                temp_dl_path.replace(raw_nc_path)
             logger.info(f"  ✅ [CAMS] 原始数据已保存至: {raw_nc_path.name}")
 
         except Exception as e:
@@ -284,7 +456,8 @@ def acquire_cams_data(target_events: Dict[str, datetime]) -> bool:
                          f"leadtime_hour={valid_leadtime_hours}, type=forecast, format=netcdf_zip")
             return False
         finally:
-            if temp_dl_path.exists(): temp_dl_path.unlink()
+            # replace 成功后临时文件已不在，missing_ok 免去一次 stat 往返
+            temp_dl_path.unlink(missing_ok=True)
 
     # 此处调用处理函数，它将内部使用全局模板
     _process_cams_nc_to_nc(raw_nc_path, target_events, base_run_time)
@@ -6,9 +6,6 @@ import numpy as np
 from datetime import datetime
 from typing import Tuple, Dict, List
 import xarray as xr
-from tqdm.auto import tqdm
-from concurrent.futures import ProcessPoolExecutor, as_completed
-from functools import partial
 
 from .astronomy import AstronomyService
 
@@ -49,6 +46,34 @@ class GlowIndexCalculator:
             
         self.weather_data = weather_data
         self.astro_service = AstronomyService()
+
+        # 缓存各变量的原始 NumPy 数组与规则网格参数，供手写双线性插值使用。
+        # xarray.interp 每次调用都要经过 scipy 调度与 DataArray 封装，
+        # 在射线采样这种百万次级别的热点路径上，纯 NumPy 索引运算快几个数量级。
+        self._var_np = {
+            var: np.ascontiguousarray(weather_data[var].values, dtype=np.float32)
+            for var in required_vars
+        }
+        self._hcc_np = self._var_np['hcc']
+        lat_vals = weather_data['hcc'].latitude.values
+        lon_vals = weather_data['hcc'].longitude.values
+        self._lat_arr = lat_vals
+        self._lon_arr = lon_vals
+        self._lat0 = float(lat_vals[0])
+        self._dlat = float(lat_vals[1] - lat_vals[0])
+        self._lon0 = float(lon_vals[0])
+        self._dlon = float(lon_vals[1] - lon_vals[0])
+        self._nlat, self._nlon = self._hcc_np.shape
+
+        # 射线搜索的步进距离只取决于类常量，在构造时物化一次，避免每条射线重复分配。
+        # 整条射线路径统一用 float32：输入本身是 2-3 位有效数字的气象数据，
+        # 半精度坐标误差（约 1 米）远小于 10 km 的搜索步长
+        self._num_steps = int(self.MAX_SEARCH_DISTANCE_KM / self.SEARCH_STEP_KM)
+        self._distances = np.linspace(self.SEARCH_STEP_KM, self.MAX_SEARCH_DISTANCE_KM, self._num_steps, dtype=np.float32)
+        self._angular_distances = self._distances / np.float32(self.EARTH_RADIUS_KM)
+        # 角距离的正余弦对所有射线相同，同样只算一次
+        self._sin_ad = np.sin(self._angular_distances)
+        self._cos_ad = np.cos(self._angular_distances)
         
         if weights:
             self.weights = self.DEFAULT_WEIGHTS.copy()
@@ -75,37 +100,62 @@ class GlowIndexCalculator:
 
     def _score_from_boundary_distance(self, distance_km: float) -> float:
         """品质因子1: 云边界距离"""
-        if distance_km >= self.MAX_SEARCH_DISTANCE_KM: return 0.0
-        if distance_km <= self.OPTIMAL_DISTANCE_KM: return distance_km / self.OPTIMAL_DISTANCE_KM
-        score = 1.0 - (distance_km - self.OPTIMAL_DISTANCE_KM) / (self.MAX_SEARCH_DISTANCE_KM - self.OPTIMAL_DISTANCE_KM)
-        return max(0.0, score)
+        return float(self._score_from_boundary_distance_vec(np.asarray(distance_km)))
+
+    def _score_from_boundary_distance_vec(self, distance_km: np.ndarray) -> np.ndarray:
+        """
+        品质因子1（矢量化）: 云边界距离的三段折线得分。
+
+        等价写法 min(上升沿, 下降沿) 再截断到 [0, 1]：
+        OPTIMAL 之前取 d/OPTIMAL，之后取线性下降，MAX 处归零。
+        """
+        rising = distance_km / self.OPTIMAL_DISTANCE_KM
+        falling = 1.0 - (distance_km - self.OPTIMAL_DISTANCE_KM) / (self.MAX_SEARCH_DISTANCE_KM - self.OPTIMAL_DISTANCE_KM)
+        return np.clip(np.minimum(rising, falling), 0.0, 1.0)
     
     def _score_from_hcc(self, hcc: float) -> float:
         """品质因子2: 高云覆盖率"""
-        if 0.4 <= hcc <= 0.8: return 1.0
-        elif hcc > 0.8: return 0.7
-        elif 0.1 <= hcc < 0.4: return 0.6
-        else: return 0.1
+        return float(self._score_from_hcc_vec(np.asarray(hcc)))
+
+    def _score_from_hcc_vec(self, hcc: np.ndarray) -> np.ndarray:
+        """品质因子2（矢量化）: np.select 对整组数组一次完成分段赋值。"""
+        return np.select(
+            [(hcc >= 0.4) & (hcc <= 0.8), hcc > 0.8, hcc >= 0.1],
+            [1.0, 0.7, 0.6],
+            default=0.1,
+        )
 
     def _score_from_mcc(self, mcc: float) -> float:
         """品质因子3: 中云覆盖率"""
-        if 0.2 <= mcc <= 0.5: return 1.0
-        elif 0.5 < mcc <= 0.8: return 0.7
-        elif mcc > 0.8: return 0.3
-        else: return 0.2
+        return float(self._score_from_mcc_vec(np.asarray(mcc)))
+
+    def _score_from_mcc_vec(self, mcc: np.ndarray) -> np.ndarray:
+        """品质因子3（矢量化）"""
+        return np.select(
+            [(mcc >= 0.2) & (mcc <= 0.5), (mcc > 0.5) & (mcc <= 0.8), mcc > 0.8],
+            [1.0, 0.7, 0.3],
+            default=0.2,
+        )
 
     def _score_from_lcc(self, lcc: float) -> float:
         """惩罚因子1: 低云遮挡"""
-        if lcc <= 0.1: return 1.0
-        elif 0.1 < lcc <= 0.3: return 0.6
-        elif 0.3 < lcc <= 0.5: return 0.1
-        else: return 0.0
+        return float(self._score_from_lcc_vec(np.asarray(lcc)))
+
+    def _score_from_lcc_vec(self, lcc: np.ndarray) -> np.ndarray:
+        """惩罚因子1（矢量化）"""
+        return np.select(
+            [lcc <= 0.1, lcc <= 0.3, lcc <= 0.5],
+            [1.0, 0.6, 0.1],
+            default=0.0,
+        )
 
     def _score_from_aod550(self, aod: float) -> float:
         """惩罚因子2: 大气透明度"""
-        if aod < 0.3: return 1.0
-        elif aod < 0.6: return 0.5
-        else: return 0.0
+        return float(self._score_from_aod550_vec(np.asarray(aod)))
+
+    def _score_from_aod550_vec(self, aod: np.ndarray) -> np.ndarray:
+        """惩罚因子2（矢量化）"""
+        return np.select([aod < 0.3, aod < 0.6], [1.0, 0.5], default=0.0)
 
     # ==========================================================
     # --- 核心计算逻辑 (已更新为新品质/惩罚模型) ---
@@ -156,8 +206,11 @@ class GlowIndexCalculator:
         quality_score = weighted_quality_score_sum / total_quality_weight if total_quality_weight > 0 else 0.0
 
         # 3. 计算“惩罚分” (相乘)
-        penalty_factors = ['score_aod550', 'score_lcc']
-        penalty_score = np.prod([all_scores[f] for f in penalty_factors if f in factors]) if penalty_factors else 1.0
+        penalty_score = 1.0
+        if 'score_aod550' in factors:
+            penalty_score *= all_scores['score_aod550']
+        if 'score_lcc' in factors:
+            penalty_score *= all_scores['score_lcc']
 
         # 4. 最终得分 = 品质分 * 惩罚分
         all_scores['final_score'] = quality_score * penalty_score
@@ -168,28 +221,42 @@ class GlowIndexCalculator:
     # ==========================================================
     
     def _get_value_at_point(self, var_name: str, lat: float, lon: float) -> float:
-        """通用方法：从 weather_data 中插值获取指定变量的值。"""
-        try:
-            return self.weather_data[var_name].interp(
-                latitude=lat, longitude=lon, method='linear', kwargs={"fill_value": 0}
-            ).item()
-        except Exception:
-            return 0.0
+        """通用方法：在规则网格上双线性插值获取指定变量在某点的值（网格外返回 0）。"""
+        return float(self._interp_grid_batch(self._var_np[var_name], np.asarray(lat), np.asarray(lon)))
+
+    def _interp_grid_batch(self, var_np: np.ndarray, lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+        """
+        在规则经纬度网格上对给定变量数组做矢量化双线性插值（纯 NumPy 实现）。
+
+        通过坐标到网格索引的仿射换算直接定位四个邻点并加权求和，
+        绕过 xarray/scipy 的逐次调度开销。网格外的点返回 0，
+        与原先 interp(fill_value=0) 的语义一致。
+        """
+        fy = (lats - self._lat0) / self._dlat
+        fx = (lons - self._lon0) / self._dlon
+        inside = (fy >= 0.0) & (fy <= self._nlat - 1) & (fx >= 0.0) & (fx <= self._nlon - 1)
+
+        fy = np.clip(fy, 0.0, self._nlat - 1.0)
+        fx = np.clip(fx, 0.0, self._nlon - 1.0)
+        i0 = np.minimum(fy.astype(np.int64), self._nlat - 2)
+        j0 = np.minimum(fx.astype(np.int64), self._nlon - 2)
+        dy = fy - i0
+        dx = fx - j0
+
+        h = var_np
+        values = (
+            (1.0 - dy) * (1.0 - dx) * h[i0, j0]
+            + dy * (1.0 - dx) * h[i0 + 1, j0]
+            + (1.0 - dy) * dx * h[i0, j0 + 1]
+            + dy * dx * h[i0 + 1, j0 + 1]
+        )
+        return np.where(inside, values, 0.0)
 
     def _find_cloud_boundary_distance(self, start_lat: float, start_lon: float, sun_azimuth_deg: float) -> float:
         """沿太阳方位角方向搜索，直到找到云量几乎为零的第一个点。"""
-        num_steps = int(self.MAX_SEARCH_DISTANCE_KM / self.SEARCH_STEP_KM)
-        distances = np.linspace(self.SEARCH_STEP_KM, self.MAX_SEARCH_DISTANCE_KM, num_steps)
-        
+        distances = self._distances
         ray_lats, ray_lons = self._calculate_destination_point_vectorized(start_lat, start_lon, sun_azimuth_deg, distances)
-        try:
-            hcc_on_ray = self.weather_data['hcc'].interp(
-                latitude=xr.DataArray(ray_lats, dims="distance"),
-                longitude=xr.DataArray(ray_lons, dims="distance"),
-                method='linear', kwargs={"fill_value": 0}
-            ).values
-        except Exception:
-            return self.SEARCH_STEP_KM
+        hcc_on_ray = self._interp_grid_batch(self._hcc_np, ray_lats, ray_lons)
 
         true_boundary_indices = np.where(hcc_on_ray < self.CLOUD_ZERO_THRESHOLD)[0]
         return distances[true_boundary_indices[0]] if true_boundary_indices.size > 0 else self.MAX_SEARCH_DISTANCE_KM
@@ -208,62 +275,140 @@ class GlowIndexCalculator:
         )
         return np.degrees(dest_lat_rad), np.degrees(dest_lon_rad)
 
-    def _calculate_for_single_index(
-        self, 
-        ij_tuple: Tuple[int, int], 
-        utc_time: datetime, 
-        factors: List[str]
-    ) -> Tuple[int, int, Dict[str, float]]:
-        """为并行计算设计的工作单元。"""
-        i, j = ij_tuple
-        lat = self.weather_data.latitude.values[i]
-        lon = self.weather_data.longitude.values[j]
-        scores = self.calculate_for_point(lat, lon, utc_time, factors=factors)
-        return i, j, scores
-
     def calculate_for_grid(
         self,
         utc_time: datetime,
         active_mask: xr.DataArray,
         factors: List[str] = None
     ) -> xr.Dataset:
-        """[并行版] 为网格中的活动区域计算火烧云指数。"""
+        """
+        [批量矢量化版] 为网格中的活动区域计算火烧云指数。
+
+        所有活动格点的射线在一次 (N_active × N_steps) 插值中完成采样，
+        云边界距离通过沿步长轴的矢量化扫描得到，
+        替代原先逐点派发 calculate_for_point 的进程池方案。
+        """
         if factors is None: factors = self.ALL_FACTORS
-        logging.info(f"开始为网格活动区域并行计算指数，使用因子: {factors}")
-        
-        results_ds = xr.Dataset({
-            score_name: xr.full_like(self.weather_data['hcc'], 0.0, dtype=np.float32)
+        logging.info(f"开始为网格活动区域批量计算指数，使用因子: {factors}")
+
+        # 结果先写进裸 NumPy 数组，最后一次性包成带坐标的 Dataset，
+        # 避免经由 xarray 带标签索引的逐项赋值
+        score_grids = {
+            score_name: np.zeros((self._nlat, self._nlon), dtype=np.float32)
             for score_name in ['final_score'] + self.ALL_FACTORS
-        })
-        
-        active_indices = [tuple(idx) for idx in np.argwhere(active_mask.values)]
-        if not active_indices:
+        }
+        lats_np = self._lat_arr
+        lons_np = self._lon_arr
+
+        def _wrap_results() -> xr.Dataset:
+            results = xr.Dataset({
+                name: xr.DataArray(
+                    grid,
+                    coords={'latitude': lats_np, 'longitude': lons_np},
+                    dims=['latitude', 'longitude'],
+                )
+                for name, grid in score_grids.items()
+            })
+            results.attrs['factors_used'] = str(factors)
+            results.attrs['vectorized_computation'] = 'True'
+            return results
+
+        active_indices = np.argwhere(active_mask.values)
+        if active_indices.size == 0:
             logging.warning("活动区域为空，无需计算。")
-            return results_ds
-        
-        num_workers = config.NUM_WORKERS
-        logging.info(f"将使用 {num_workers} 个工作进程进行并行计算。")
+            return _wrap_results()
 
-        task_function = partial(self._calculate_for_single_index, utc_time=utc_time, factors=factors)
+        ii, jj = active_indices[:, 0], active_indices[:, 1]
+        active_lats = lats_np[ii]
+        active_lons = lons_np[jj]
 
-        with ProcessPoolExecutor(max_workers=num_workers) as executor:
-            futures = [executor.submit(task_function, ij_tuple) for ij_tuple in active_indices]
-            
-            progress_desc = f"Calculating Glow Index ({len(factors)} factors)"
-            with tqdm(total=len(futures), desc=progress_desc) as pbar:
-                for future in as_completed(futures):
-                    try:
-                        i, j, scores = future.result()
-                        for score_name, value in scores.items():
-                            if score_name in results_ds:
-                                results_ds[score_name][i, j] = value
-                    except Exception as e:
-                        logging.error(f"一个并行任务失败: {e}", exc_info=False)
-                    finally:
-                        pbar.update(1)
-        
-        results_ds.attrs['factors_used'] = str(factors)
-        results_ds.attrs['parallel_computation'] = 'True'
-        
-        logging.info("多因子网格并行计算完成。")
-        return results_ds
\ No newline at end of file
+        # 1. 局地变量：活动点就是网格点本身，直接花式索引取值（等价于在格点上做线性插值）
+        local_hcc = self.weather_data['hcc'].values[ii, jj]
+        local_mcc = self.weather_data['mcc'].values[ii, jj]
+        local_lcc = self.weather_data['lcc'].values[ii, jj]
+        local_aod550 = self.weather_data['aod550'].values[ii, jj]
+        # 几乎无高云的点没有观赏价值，射线搜索对它们纯属浪费：
+        # 在任何射线计算之前先用云量掩码收缩活动集合
+        cloudy = local_hcc >= self.CLOUD_THRESHOLD
+        n_cloudy = int(cloudy.sum())
+        logging.info(f"活动点 {len(ii)} 个，云量预筛后需射线计算的点 {n_cloudy} 个。")
+
+        distances = self._distances
+        boundary_distances = np.full(len(ii), self.MAX_SEARCH_DISTANCE_KM, dtype=np.float32)
+
+        if n_cloudy > 0:
+            cloudy_lats = active_lats[cloudy].astype(np.float32)
+            cloudy_lons = active_lons[cloudy].astype(np.float32)
+
+            # 2. 太阳方位角：NOAA 公式矢量化一次算出所有待计算点的方位角
+            azimuths = self.astro_service.get_sun_position_grid(cloudy_lats, cloudy_lons, utc_time)['azimuth'].astype(np.float32)
+
+            # 目标点公式按 (起点 × 步长) 广播展开：
+            # 起点纬度/方位角的正余弦每条射线算一次，角距离的正余弦取构造时的缓存
+            sin_lat = np.sin(np.radians(cloudy_lats))[:, np.newaxis]
+            cos_lat = np.cos(np.radians(cloudy_lats))[:, np.newaxis]
+            sin_b = np.sin(np.radians(azimuths))[:, np.newaxis]
+            cos_b = np.cos(np.radians(azimuths))[:, np.newaxis]
+            sin_ad = self._sin_ad[np.newaxis, :]
+            cos_ad = self._cos_ad[np.newaxis, :]
+
+            sin_dest_lat = sin_lat * cos_ad + cos_lat * sin_ad * cos_b
+            ray_lats = np.degrees(np.arcsin(sin_dest_lat))
+            ray_lons = cloudy_lons[:, np.newaxis] + np.degrees(
+                np.arctan2(sin_b * sin_ad * cos_lat, cos_ad - sin_lat * sin_dest_lat)
+            )
+
+            # 3. 手写双线性插值一次性得到 (N_cloudy, N_steps) 的 HCC 数组
+            hcc_on_rays = self._interp_grid_batch(self._hcc_np, ray_lats, ray_lons)
+
+            # 4. 矢量化的边界检测：沿步长轴找第一个云量低于阈值的位置
+            below_threshold = hcc_on_rays < self.CLOUD_ZERO_THRESHOLD
+            has_boundary = below_threshold.any(axis=1)
+            first_idx = below_threshold.argmax(axis=1)
+            boundary_distances[cloudy] = np.where(has_boundary, distances[first_idx], self.MAX_SEARCH_DISTANCE_KM)
+
+        # 5. 各分项评分：全部走矢量化评分函数
+        score_boundary = self._score_from_boundary_distance_vec(boundary_distances)
+        score_hcc = self._score_from_hcc_vec(local_hcc)
+        score_mcc = self._score_from_mcc_vec(local_mcc)
+        score_lcc = self._score_from_lcc_vec(local_lcc)
+        score_aod550 = self._score_from_aod550_vec(local_aod550)
+
+        # 与 calculate_for_point 一致：几乎无高云的点没有观赏价值
+        score_boundary = np.where(cloudy, score_boundary, 0.0)
+        score_hcc = np.where(cloudy, score_hcc, 0.0)
+
+        all_scores = {
+            'score_boundary': score_boundary,
+            'score_hcc': score_hcc,
+            'score_mcc': score_mcc,
+            'score_lcc': score_lcc,
+            'score_aod550': score_aod550,
+        }
+
+        # 6. 品质分（加权平均）× 惩罚分（相乘）：
+        #    因子选择折算成标量权重后，整个组合是一条融合的数组表达式
+        w_b = self.weights.get('score_boundary', 0) if 'score_boundary' in factors else 0.0
+        w_h = self.weights.get('score_hcc', 0) if 'score_hcc' in factors else 0.0
+        w_m = self.weights.get('score_mcc', 0) if 'score_mcc' in factors else 0.0
+        total_quality_weight = w_b + w_h + w_m
+        if total_quality_weight > 0:
+            quality_score = (w_b * score_boundary + w_h * score_hcc + w_m * score_mcc) / total_quality_weight
+        else:
+            quality_score = np.zeros_like(score_boundary)
+
+        penalty_score = 1.0
+        if 'score_aod550' in factors:
+            penalty_score = penalty_score * score_aod550
+        if 'score_lcc' in factors:
+            penalty_score = penalty_score * score_lcc
+
+        final_score = np.where(cloudy, quality_score * penalty_score, 0.0)
+
+        # 7. 单次花式索引写回结果网格
+        score_grids['final_score'][ii, jj] = final_score
+        for score_name, values in all_scores.items():
+            score_grids[score_name][ii, jj] = values
+
+        logging.info(f"多因子网格批量计算完成（{len(ii)} 个活动点）。")
+        return _wrap_results()
\ No newline at end of file
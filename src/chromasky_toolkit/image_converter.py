@@ -4,7 +4,7 @@ import logging
 from pathlib import Path
 from PIL import Image
 from tqdm.auto import tqdm
-from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures import ProcessPoolExecutor
 
 from . import config
 
@@ -76,17 +76,16 @@ def run_conversion():
     fail_count = 0
 
     with ProcessPoolExecutor(max_workers=num_workers) as executor:
-        futures = [executor.submit(_convert_single_image, png_path) for png_path in png_files]
-        
-        with tqdm(total=len(futures), desc="Converting to WebP") as pbar:
-            for future in as_completed(futures):
-                source, result = future.result()
-                if result:
-                    success_count += 1
-                    logger.debug(f"  ✅ {source} -> {result}")
-                else:
-                    fail_count += 1
-                pbar.update(1)
+        # map + chunksize 把多个文件合并为一次进程间往返，避免逐文件的任务调度开销
+        chunksize = max(1, len(png_files) // (4 * num_workers))
+        results = executor.map(_convert_single_image, png_files, chunksize=chunksize)
+
+        for source, result in tqdm(results, total=len(png_files), desc="Converting to WebP"):
+            if result:
+                success_count += 1
+                logger.debug(f"  ✅ {source} -> {result}")
+            else:
+                fail_count += 1
 
     logger.info(f"转换完成: {success_count} 个成功, {fail_count} 个失败。")
     logger.info("====== 格式转换流程执行完毕！ ======")
\ No newline at end of file
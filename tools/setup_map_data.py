@@ -1,10 +1,12 @@
 # tools/setup_map_data.py
 
 import logging
+import os
 import shutil
-import tempfile
+import urllib.error
 import urllib.request
 import zipfile
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 # 确保能正确导入项目配置
@@ -25,7 +27,6 @@ logger = logging.getLogger("DataSetup")
 
 # --- 地图数据配置 ---
 MAP_DATA_URL = "https://ghfast.top/https://github.com/Supeset/China-GeoData/archive/refs/heads/master.zip"
-MAP_ZIP_FILENAME = "china-geodata.zip"
 
 # --- 字体数据配置 ---
 FONT_BASE_URL = "https://ghfast.top/https://github.com/lxgw/LxgwWenKai/raw/main/fonts/TTF/"
@@ -35,6 +36,17 @@ FONT_FILENAMES = [
 FONT_TARGET_DIR = config.FONT_DIR
 
 
+def _download_file(url: str, target_path: Path) -> None:
+    """
+    以流式方式下载文件到 target_path。
+
+    urlretrieve 内部用 8KB 缓冲，对几 MB 的 zip/字体要做上千次
+    read()/write() 往返；1MiB 缓冲把系统调用次数降低两个量级。
+    """
+    with urllib.request.urlopen(url) as response, open(target_path, 'wb') as f:
+        shutil.copyfileobj(response, f, length=1 << 20)
+
+
 def setup_font_data():
     """
     自动下载并设置绘图所需的“霞鹜文楷”字体。
@@ -52,22 +64,26 @@ def setup_font_data():
         logger.info("===== 字体文件设置完成！ =====")
         return
 
-    # 3. 循环下载所有字体文件
-    files_downloaded = 0
-    for filename in FONT_FILENAMES:
+    # 3. 并发下载所有缺失的字体文件
+    # 下载是纯网络 I/O，多个文件时用线程池并发可使总耗时约等于最慢的那一个
+    def _download_one(filename: str) -> bool:
         target_path = FONT_TARGET_DIR / filename
         if target_path.exists():
             logger.info(f"  - 字体 '{filename}' 已存在，跳过。")
-            continue
+            return False
 
         download_url = FONT_BASE_URL + filename
         try:
             logger.info(f"  - 正在从 {download_url} 下载字体...")
-            urllib.request.urlretrieve(download_url, target_path)
+            _download_file(download_url, target_path)
             logger.info(f"    > 字体已成功保存到: {target_path}")
-            files_downloaded += 1
+            return True
         except Exception as e:
             logger.error(f"    > 下载字体 '{filename}' 失败: {e}")
+            return False
+
+    with ThreadPoolExecutor(max_workers=min(len(FONT_FILENAMES), 4)) as executor:
+        files_downloaded = sum(executor.map(_download_one, FONT_FILENAMES))
 
     if files_downloaded > 0:
         logger.info(f"✅ 成功下载 {files_downloaded} 个新的字体文件。")
@@ -90,62 +106,83 @@ def setup_map_data():
     logger.info(f"地图数据将被安装到: {TARGET_DIR.resolve()}")
 
     # 2. 检查是否已存在所有必要文件
+    # 单次 scandir 取回整个目录，替代逐路径 exists() 的多次 stat 调用
     required_files = [
         config.CHINA_SHP_PATH,
         config.NINE_DASH_LINE_SHP_PATH,
         config.CITIES_CSV_PATH
     ]
-    if all(f.exists() for f in required_files):
+    existing_names = {entry.name for entry in os.scandir(TARGET_DIR)}
+    if {f.name for f in required_files}.issubset(existing_names):
         logger.info("✅ 检测到所有必需的 Shapefile 和城市数据文件均已存在。设置完成，跳过下载。")
         logger.info("===== 地图数据设置完成！ =====")
         return
 
-    # 3. 使用临时目录进行下载和解压
-    with tempfile.TemporaryDirectory() as tmpdir:
-        tmp_path = Path(tmpdir)
-        zip_path = tmp_path / MAP_ZIP_FILENAME
-
-        # 4. 下载ZIP文件
+    # 3. 下载ZIP文件（持久缓存 + ETag 条件请求）
+    # 压缩包缓存在 map_data/.cache 下；重跑时带 If-None-Match，
+    # 远端未变化则命中 304，重新安装只剩本地解压的开销，零网络字节
+    cache_dir = TARGET_DIR / ".cache"
+    cache_zip = cache_dir / "china-geodata.zip"
+    etag_path = cache_zip.with_suffix(".etag")
+    try:
+        request = urllib.request.Request(MAP_DATA_URL)
+        if cache_zip.exists() and etag_path.exists():
+            request.add_header("If-None-Match", etag_path.read_text())
+        logger.info(f"正在从 {MAP_DATA_URL} 下载数据...")
         try:
-            logger.info(f"正在从 {MAP_DATA_URL} 下载数据...")
-            urllib.request.urlretrieve(MAP_DATA_URL, zip_path)
-            logger.info(f"数据已成功下载到临时文件: {zip_path}")
-        except Exception as e:
-            logger.error(f"下载失败: {e}")
-            return
-
-        # 5. 解压ZIP文件
-        extract_path = tmp_path / "extracted_data"
-        try:
-            with zipfile.ZipFile(zip_path, "r") as zip_ref:
-                zip_ref.extractall(extract_path)
-            logger.info(f"文件已成功解压到临时目录: {extract_path}")
-        except Exception as e:
-            logger.error(f"解压失败: {e}")
-            return
-
-        # 6. 找到并移动所需文件
-        repo_root_dir = next(extract_path.glob("China-GeoData-*"), None)
-        if not repo_root_dir or not repo_root_dir.is_dir():
-            logger.error("在解压目录中未找到预期的 'China-GeoData-*' 文件夹。")
+            with urllib.request.urlopen(request) as response:
+                cache_dir.mkdir(exist_ok=True)
+                # 先写 .tmp 再原子替换，中途失败不会留下半截缓存
+                tmp_zip = cache_zip.with_suffix(".tmp")
+                with open(tmp_zip, "wb") as f:
+                    shutil.copyfileobj(response, f, length=1 << 20)
+                os.replace(tmp_zip, cache_zip)
+                etag = response.headers.get("ETag")
+                if etag:
+                    etag_path.write_text(etag)
+            logger.info(f"数据已下载并缓存到: {cache_zip}")
+        except urllib.error.HTTPError as e:
+            if e.code != 304:
+                raise
+            logger.info("✅ 远端数据未变化 (HTTP 304)，复用本地缓存的压缩包。")
+    except Exception as e:
+        logger.error(f"下载失败: {e}")
+        if not cache_zip.exists():
             return
+        logger.warning("将尝试使用已有的本地缓存压缩包继续。")
+
+    # 4. 把所需成员直接从压缩包流式写入 TARGET_DIR：
+    # 只解 shp/ 下的文件和 csv/china_cities.csv，不经过临时目录也无需再移动；
+    # zlib 解压会释放 GIL，线程池可让多个成员的解压和写盘相互重叠
+    try:
+        with zipfile.ZipFile(cache_zip) as zip_ref:
+            wanted = [
+                info for info in zip_ref.infolist()
+                if not info.is_dir()
+                and ("/shp/" in info.filename or info.filename.endswith("/csv/china_cities.csv"))
+            ]
+            if not wanted:
+                logger.error("压缩包中未找到预期的 shp/ 或 csv/china_cities.csv 成员。")
+                return
+
+            def _extract_one(info: zipfile.ZipInfo) -> bool:
+                dst = TARGET_DIR / Path(info.filename).name
+                try:
+                    with zip_ref.open(info) as src, open(dst, "wb") as out:
+                        shutil.copyfileobj(src, out, length=1 << 20)
+                    return True
+                except OSError as e:
+                    logger.error(f"  - 解压文件 '{info.filename}' 失败: {e}")
+                    return False
+
+            with ThreadPoolExecutor(max_workers=min(8, len(wanted))) as executor:
+                files_installed = sum(executor.map(_extract_one, wanted))
+    except Exception as e:
+        logger.error(f"解压失败: {e}")
+        return
 
-        source_shp_dir = repo_root_dir / "shp"
-        source_csv_dir = repo_root_dir / "csv"
-        
-        files_moved = 0
-        if source_shp_dir.exists():
-            for file_path in source_shp_dir.glob("*"):
-                shutil.move(str(file_path), str(TARGET_DIR / file_path.name))
-                files_moved += 1
-        
-        cities_csv_source = source_csv_dir / "china_cities.csv"
-        if cities_csv_source.exists():
-            shutil.move(str(cities_csv_source), str(TARGET_DIR / cities_csv_source.name))
-            files_moved += 1
-
-        if files_moved > 0:
-            logger.info(f"✅ 成功移动 {files_moved} 个地图和数据文件。")
+    if files_installed > 0:
+        logger.info(f"✅ 成功安装 {files_installed} 个地图和数据文件。")
 
     logger.info("===== 地图数据设置完成！ =====")
 